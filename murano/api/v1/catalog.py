@@ -14,12 +14,14 @@
 #    under the License.
 
 import cgi
+import hashlib
 import jsonschema
 import os
 import tempfile
 
 from oslo.config import cfg
 from oslo.db import exception as db_exc
+import webob
 from webob import exc
 
 import murano.api.v1
@@ -41,6 +43,7 @@ SUPPORTED_PARAMS = murano.api.v1.SUPPORTED_PARAMS
 LIST_PARAMS = murano.api.v1.LIST_PARAMS
 ORDER_VALUES = murano.api.v1.ORDER_VALUES
 PKG_PARAMS_MAP = murano.api.v1.PKG_PARAMS_MAP
+CHUNK_SIZE = 64 * 1024
 
 
 def _check_content_type(req, content_type):
@@ -78,20 +81,8 @@ def _get_filters(query_params):
 def _validate_body(body):
     """Check multipart/form-data has two parts: text (which is json string and
        should parsed into dictionary in serializer) and file, which stores as
-       cgi.FieldStorage instance. Also validate file size doesn't exceed
-       the limit: seek to the end of the file, get the position of EOF and
-       reset the file position to the beginning
+       cgi.FieldStorage instance.
     """
-    def check_file_size(f):
-        mb_limit = CONF.packages_opts.package_size_limit
-        pkg_size_limit = mb_limit * 1024 * 1024
-        f.seek(0, 2)
-        size = f.tell()
-        f.seek(0)
-        if size > pkg_size_limit:
-            raise exc.HTTPBadRequest('Uploading file is too large.'
-                                     ' The limit is {0} Mb'.format(mb_limit))
-
     if len(body.keys()) > 2:
         msg = _("'multipart/form-data' request body should contain "
                 "1 or 2 parts: json string and zip archive. Current body "
@@ -104,7 +95,6 @@ def _validate_body(body):
     for part in body.values():
         if isinstance(part, cgi.FieldStorage):
             file_obj = part
-            check_file_size(file_obj.file)
 
         if isinstance(part, dict):
             package_meta = part
@@ -115,6 +105,47 @@ def _validate_body(body):
     return file_obj, package_meta
 
 
+def _store_archive(source, target):
+    """Copy uploaded archive to the target file chunk by chunk, checking
+       that its size doesn't exceed the limit while copying
+    """
+    mb_limit = CONF.packages_opts.package_size_limit
+    pkg_size_limit = mb_limit * 1024 * 1024
+    size = 0
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            return size
+        size += len(chunk)
+        if size > pkg_size_limit:
+            raise exc.HTTPBadRequest('Uploading file is too large.'
+                                     ' The limit is {0} Mb'.format(mb_limit))
+        target.write(chunk)
+
+
+def _iter_chunks(data):
+    for offset in xrange(0, len(data), CHUNK_SIZE):
+        yield data[offset:offset + CHUNK_SIZE]
+
+
+def _binary_response(data, etag):
+    """Build response sending data in chunks. The response is conditional,
+       so ETag and Range request headers are honoured.
+    """
+    response = webob.Response(content_type='application/octet-stream',
+                              conditional_response=True)
+    response.app_iter = _iter_chunks(data)
+    response.content_length = len(data)
+    response.etag = etag
+    return response
+
+
+def _package_etag(package):
+    """ETag of package archive, which changes with every package update"""
+    return hashlib.md5('{0}:{1}'.format(package.id,
+                                        package.updated)).hexdigest()
+
+
 class Controller(object):
     """WSGI controller for application catalog resource in Murano v1 API."""
 
@@ -180,6 +211,23 @@ class Controller(object):
         result['packages'] = [package.to_dict() for package in packages]
         return result
 
+    def find_classes(self, req):
+        policy.check("search_packages", req.context)
+
+        class_names = req.GET.getall('class_name')
+        if not class_names:
+            msg = _("At least one class_name should be specified")
+            LOG.error(msg)
+            raise exc.HTTPBadRequest(explanation=msg)
+
+        rows = db_api.class_packages_get(class_names, req.context)
+        return {'classes': [{'class_name': class_name,
+                             'package_id': package_id,
+                             'fully_qualified_name': fqn,
+                             'updated': updated}
+                            for class_name, package_id, fqn, updated
+                            in rows]}
+
     def upload(self, req, body=None):
         """Upload new file archive for the new package
            together with package metadata.
@@ -199,28 +247,32 @@ class Controller(object):
 
         with tempfile.NamedTemporaryFile(delete=False) as tempf:
             LOG.debug("Storing package archive in a temporary file")
-            content = file_obj.file.read()
-            if not content:
+            try:
+                size = _store_archive(file_obj.file, tempf)
+            except exc.HTTPBadRequest:
+                os.remove(tempf.name)
+                raise
+        try:
+            if not size:
                 msg = _("Uploading file can't be empty")
                 LOG.error(msg)
                 raise exc.HTTPBadRequest(msg)
-            tempf.write(content)
-            package_meta['archive'] = content
-        try:
-            pkg_to_upload = load_utils.load_from_file(
-                tempf.name, target_dir=None, drop_dir=True)
-        except pkg_exc.PackageLoadError as e:
-            LOG.exception(e)
-            raise exc.HTTPBadRequest(e)
+            try:
+                pkg_to_upload = load_utils.load_from_zip(tempf.name)
+            except pkg_exc.PackageLoadError as e:
+                LOG.exception(e)
+                raise exc.HTTPBadRequest(e)
+            with pkg_to_upload:
+                # extend dictionary for update db
+                for k, v in PKG_PARAMS_MAP.iteritems():
+                    if hasattr(pkg_to_upload, k):
+                        package_meta[v] = getattr(pkg_to_upload, k)
+            with open(tempf.name, 'rb') as archive:
+                package_meta['archive'] = archive.read()
         finally:
             LOG.debug("Deleting package archive temporary file")
             os.remove(tempf.name)
 
-        # extend dictionary for update db
-        for k, v in PKG_PARAMS_MAP.iteritems():
-            if hasattr(pkg_to_upload, k):
-                package_meta[v] = getattr(pkg_to_upload, k)
-
         if req.params.get('is_public', '').lower() == 'true':
             policy.check('publicize_image', req.context)
             package_meta['is_public'] = True
@@ -237,26 +289,31 @@ class Controller(object):
         target = {'package_id': package_id}
         policy.check("get_package_ui", req.context, target)
 
-        package = db_api.package_get(package_id, req.context)
-        return package.ui_definition
+        return db_api.package_blob_get(package_id, req.context,
+                                       'ui_definition')
 
     def get_logo(self, req, package_id):
         target = {'package_id': package_id}
         policy.check("get_package_logo", req.context, target)
 
-        package = db_api.package_get(package_id, req.context)
-        return package.logo
+        return db_api.package_blob_get(package_id, req.context, 'logo')
 
     def get_supplier_logo(self, req, package_id):
-        package = db_api.package_get(package_id, req.context)
-        return package.supplier_logo
+        return db_api.package_blob_get(package_id, req.context,
+                                       'supplier_logo')
 
     def download(self, req, package_id):
         target = {'package_id': package_id}
         policy.check("download_package", req.context, target)
 
         package = db_api.package_get(package_id, req.context)
-        return package.archive
+        etag = _package_etag(package)
+        if etag in req.if_none_match:
+            response = webob.Response(status=304)
+            response.etag = etag
+            return response
+        archive = db_api.package_blob_get(package_id, req.context, 'archive')
+        return _binary_response(archive, etag)
 
     def delete(self, req, package_id):
         target = {'package_id': package_id}
@@ -273,6 +330,8 @@ class Controller(object):
 
 class PackageSerializer(wsgi.ResponseSerializer):
     def serialize(self, action_result, accept, action):
+        if isinstance(action_result, webob.Response):
+            return action_result
         if action == 'get_ui':
             accept = 'text/plain'
         elif action in ('download', 'get_logo', 'get_supplier_logo'):
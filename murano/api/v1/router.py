@@ -189,6 +189,10 @@ class API(wsgi.Router):
                        controller=catalog_resource,
                        action='download',
                        conditions={'method': ['GET']})
+        mapper.connect('/catalog/classes',
+                       controller=catalog_resource,
+                       action='find_classes',
+                       conditions={'method': ['GET']})
 
         req_stats_resource = request_statistics.create_resource()
         mapper.connect('/stats',
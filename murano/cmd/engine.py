@@ -44,8 +44,15 @@ def main():
         config.parse_args()
         log.setup('murano')
 
-        launcher = service.ServiceLauncher()
-        launcher.launch_service(engine.get_rpc_service())
+        workers = config.CONF.engine.workers
+        if workers < 1:
+            raise RuntimeError('[engine] workers must be at least 1')
+        if config.CONF.engine.max_concurrent_tasks < 1:
+            raise RuntimeError(
+                '[engine] max_concurrent_tasks must be at least 1')
+        if workers > 1:
+            engine.warm_up_caches()
+        launcher = service.launch(engine.EngineService(), workers=workers)
 
         launcher.wait()
     except RuntimeError as e:
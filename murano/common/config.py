@@ -190,7 +190,27 @@ engine_opts = [
                help=_('Path to class configuration files')),
     cfg.BoolOpt('use_trusts', default=False,
                 help=_("Create resources using trust token rather "
-                       "than user's token"))
+                       "than user's token")),
+    cfg.IntOpt('workers', default=1,
+               help=_('Number of engine worker processes, at least 1. '
+                      'Each worker consumes tasks from the same queue and '
+                      'runs them on its own CPU core. Tasks of an '
+                      'environment wait for each other using lock files '
+                      'in lock_path.')),
+    cfg.IntOpt('health_report_interval', default=60,
+               help=_('Interval in seconds between health reports of '
+                      'engine workers. 0 disables the reports.')),
+    cfg.IntOpt('max_concurrent_tasks', default=64,
+               help=_('Maximum number of tasks run at the same time by '
+                      'an engine worker, at least 1. Tasks of the same '
+                      'environment always run one after another.')),
+    cfg.IntOpt('report_flush_interval', default=1000,
+               help=_('Maximum time in milliseconds status reports of a '
+                      'task are buffered before they are sent to the '
+                      'API.')),
+    cfg.IntOpt('report_batch_size', default=50,
+               help=_('Number of buffered status reports of a task that '
+                      'are sent to the API in a single notification.'))
 ]
 
 # TODO(sjmc7): move into engine opts?
@@ -203,6 +223,11 @@ packages_opts = [
     cfg.StrOpt('packages_cache', default=None,
                help='Location (directory) for Murano package cache.'),
 
+    cfg.IntOpt('packages_cache_size_limit', default=1024,
+               help='Maximum size of the package cache shared by engine '
+                    'tasks, Mb. Least recently used packages are removed '
+                    'when the limit is exceeded. 0 disables the limit.'),
+
     cfg.IntOpt('package_size_limit', default=5,
                help='Maximum application package size, Mb'),
 
@@ -214,6 +239,16 @@ packages_opts = [
                     'pagination request')
 ]
 
+status_reports_opts = [
+    cfg.IntOpt('flush_interval', default=500,
+               help=_('Maximum time in milliseconds status reports of '
+                      'deployments are buffered by the API before they '
+                      'are stored in the database.')),
+    cfg.IntOpt('flush_size', default=100,
+               help=_('Number of buffered status reports that are stored '
+                      'in the database at once.'))
+]
+
 file_server = [
     cfg.StrOpt('file_server', default='')
 ]
@@ -238,6 +273,7 @@ CONF.register_cli_opts(metadata_dir)
 CONF.register_opts(packages_opts, group='packages_opts')
 CONF.register_opts(stats_opts, group='stats')
 CONF.register_opts(networking_opts, group='networking')
+CONF.register_opts(status_reports_opts, group='status_reports')
 
 
 def parse_args(args=None, usage=None, default_config_files=None):
@@ -13,8 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import tempfile
+import time
+import types
 import uuid
 
+import eventlet
 import eventlet.debug
 from oslo import messaging
 from oslo.messaging import target
@@ -26,6 +31,7 @@ from murano.common import rpc
 from murano.dsl import dsl_exception
 from murano.dsl import executor
 from murano.dsl import results_serializer
+from murano.dsl import yaql_expression
 from murano.engine import auth_utils
 from murano.engine import client_manager
 from murano.engine import environment
@@ -33,28 +39,76 @@ from murano.engine import package_class_loader
 from murano.engine import package_loader
 from murano.engine.system import status_reporter
 import murano.engine.system.system_objects as system_objects
+from murano.engine import task_scheduler
 from murano.openstack.common.gettextutils import _
+from murano.openstack.common import lockutils
 from murano.openstack.common import log as logging
+from murano.openstack.common import service
 
-RPC_SERVICE = None
+CONF = config.CONF
 
 LOG = logging.getLogger(__name__)
 
 eventlet.debug.hub_exceptions(False)
 
 
+class WorkerHealth(object):
+    """Task counters of the engine worker process"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started_at = self.last_task_at = time.time()
+        self.tasks_started = 0
+        self.tasks_failed = 0
+        self.tasks_in_progress = 0
+
+    def task_started(self):
+        self.tasks_started += 1
+        self.tasks_in_progress += 1
+        self.last_task_at = time.time()
+
+    def task_finished(self, failed=False):
+        self.tasks_in_progress -= 1
+        if failed:
+            self.tasks_failed += 1
+
+    def report(self):
+        return {
+            'pid': os.getpid(),
+            'uptime': int(time.time() - self.started_at),
+            'tasks_started': self.tasks_started,
+            'tasks_failed': self.tasks_failed,
+            'tasks_in_progress': self.tasks_in_progress,
+            'idle': int(time.time() - self.last_task_at)
+        }
+
+
+WORKER_HEALTH = WorkerHealth()
+
+
 class TaskProcessingEndpoint(object):
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+
+    def handle_task(self, context, task):
+        self._scheduler.submit(task['tenant_id'], task['id'], task)
+
     @staticmethod
-    def handle_task(context, task):
+    def process_task(task):
         s_task = token_sanitizer.TokenSanitizer().sanitize(task)
         LOG.info(_('Starting processing task: {task_desc}').format(
             task_desc=jsonutils.dumps(s_task)))
 
         result = task['model']
+        failed = False
+        WORKER_HEALTH.task_started()
         try:
             task_executor = TaskExecutor(task)
             result = task_executor.execute()
         except Exception as e:
+            failed = True
             LOG.exception('Error during task execution for tenant %s',
                           task['tenant_id'])
             msg_env = Environment(task['id'])
@@ -62,23 +116,113 @@ class TaskProcessingEndpoint(object):
             reporter.initialize(msg_env)
             reporter.report_error(msg_env, str(e))
         finally:
-            rpc.api().process_result(result, task['id'])
+            WORKER_HEALTH.task_finished(failed)
+            # reports have to reach the API before the result
+            status_reporter.flush(task['id'])
+            num_errors, num_warnings = status_reporter.pop_problems(
+                task['id'])
+            rpc.api().process_result(result, task['id'],
+                                     num_errors, num_warnings)
+
+    @staticmethod
+    def process_task_exclusively(task):
+        """Processes the task while no other worker runs its environment
+
+        Tasks are consumed by all engine workers of the host, while the
+        task scheduler only keeps tasks of an environment apart within a
+        single worker.
+        """
+        with _lock_environment(task['id']):
+            TaskProcessingEndpoint.process_task(task)
+
 
+def _lock_environment(environment_id):
+    lock_path = os.path.abspath(
+        CONF.lock_path or
+        os.path.join(tempfile.gettempdir(), 'murano-engine-locks'))
+    return lockutils.lock(environment_id, 'murano-environment-',
+                          external=True, lock_path=lock_path)
 
-def _prepare_rpc_service(server_id):
-    endpoints = [TaskProcessingEndpoint()]
+
+def _prepare_rpc_service(server_id, scheduler):
+    endpoints = [TaskProcessingEndpoint(scheduler)]
 
     transport = messaging.get_transport(config.CONF)
     s_target = target.Target('murano', 'tasks', server=server_id)
     return messaging.get_rpc_server(transport, s_target, endpoints, 'eventlet')
 
 
-def get_rpc_service():
-    global RPC_SERVICE
-
-    if RPC_SERVICE is None:
-        RPC_SERVICE = _prepare_rpc_service(str(uuid.uuid4()))
-    return RPC_SERVICE
+def warm_up_caches():
+    """Fills process-wide caches before engine workers are forked
+
+    Forked workers share memory pages of the caches with the parent process
+    until they are modified, instead of each filling its own copy.
+    """
+    package_class_loader.PackageClassLoader.class_configs.preload(
+        CONF.engine.class_configs)
+    # builds parser tables of YAQL
+    yaql_expression.parse('$')
+
+
+class EngineService(service.Service):
+    """RPC server of a single engine worker
+
+    The RPC server is created when the service is started so that each
+    worker process gets its own connection to the message broker. Received
+    tasks are run by the task scheduler of the worker. With several
+    workers, tasks of an environment are also kept from running in two
+    workers at once by a lock file.
+    """
+
+    def __init__(self):
+        super(EngineService, self).__init__()
+        self.server = None
+        self.scheduler = None
+
+    def start(self):
+        super(EngineService, self).start()
+        WORKER_HEALTH.reset()
+        if CONF.engine.workers > 1:
+            handler = TaskProcessingEndpoint.process_task_exclusively
+        else:
+            handler = TaskProcessingEndpoint.process_task
+        self.scheduler = task_scheduler.TaskScheduler(
+            handler, CONF.engine.max_concurrent_tasks)
+        self.server = _prepare_rpc_service(
+            str(uuid.uuid4()), self.scheduler)
+        self.server.start()
+        if CONF.engine.health_report_interval > 0:
+            self.tg.add_thread(self._report_health_loop)
+
+    def stop(self):
+        if self.server is not None:
+            self.server.stop()
+            self.server.wait()
+            self.server = None
+        if self.scheduler is not None:
+            # tasks are acknowledged on receipt, so finish all of them
+            self.scheduler.wait()
+        super(EngineService, self).stop()
+
+    def _report_health_loop(self):
+        while True:
+            eventlet.sleep(CONF.engine.health_report_interval)
+            self.report_health()
+
+    def report_health(self):
+        LOG.info('Engine worker health: {pid}: uptime {uptime}s, '
+                 'tasks started: {tasks_started}, failed: {tasks_failed}, '
+                 'in progress: {tasks_in_progress}, '
+                 'idle: {idle}s'.format(**WORKER_HEALTH.report()))
+        if self.scheduler is None:
+            return
+        for tenant_id, stats in sorted(self.scheduler.stats.iteritems()):
+            LOG.info('Engine tasks of tenant {tenant_id}: '
+                     'queued: {queued}, running: {running}, '
+                     'completed: {completed}, '
+                     'average wait: {average_wait_time:.3f}s, '
+                     'average run: {average_run_time:.3f}s'.format(
+                         tenant_id=tenant_id, **stats))
 
 
 class Environment:
@@ -127,6 +271,7 @@ class TaskExecutor(object):
     def _execute(self, pkg_loader):
         class_loader = package_class_loader.PackageClassLoader(pkg_loader)
         system_objects.register(class_loader, pkg_loader)
+        class_loader.preload_classes(self._list_object_types(self.model))
 
         exc = executor.MuranoDslExecutor(class_loader, self.environment)
         obj = exc.load(self.model)
@@ -148,8 +293,24 @@ class TaskExecutor(object):
 
         result = results_serializer.serialize(obj, exc)
         result['SystemData'] = self._environment.system_attributes
+        LOG.debug('Class config lookups: {lookups}, '
+                  'reads: {reads}'.format(**class_loader.config_stats))
         return result
 
+    def _list_object_types(self, data):
+        if isinstance(data, types.DictionaryType):
+            for val in data.values():
+                for res in self._list_object_types(val):
+                    yield res
+            sys_dict = data.get('?')
+            if isinstance(sys_dict, types.DictionaryType) \
+                    and isinstance(sys_dict.get('type'), types.StringTypes):
+                yield sys_dict['type']
+        elif isinstance(data, types.ListType):
+            for val in data:
+                for res in self._list_object_types(val):
+                    yield res
+
     def _invoke(self, mpl_executor):
         obj = mpl_executor.object_store.get(self.action['object_id'])
         method_name, args = self.action['method'], self.action['args']
@@ -26,9 +26,12 @@ class ApiClient(object):
         client_target = target.Target('murano', 'results')
         self._client = rpc.RPCClient(transport, client_target, timeout=15)
 
-    def process_result(self, result, environment_id):
-        return self._client.call({}, 'process_result', result=result,
-                                 environment_id=environment_id)
+    def process_result(self, result, environment_id, num_errors=None,
+                       num_warnings=None):
+        return self._client.cast({}, 'process_result', result=result,
+                                 environment_id=environment_id,
+                                 num_errors=num_errors,
+                                 num_warnings=num_warnings)
 
 
 class EngineClient(object):
@@ -14,21 +14,26 @@
 
 import uuid
 
+import eventlet
 from oslo import messaging
 from oslo.messaging.notify import dispatcher as oslo_dispatcher
 from oslo.messaging import target
 from oslo.utils import timeutils
 
+import sqlalchemy as sa
 from sqlalchemy import desc
+from sqlalchemy import func
 
 from murano.common import config
 from murano.common.helpers import token_sanitizer
+from murano.common import uuidutils
 from murano.db import models
 from murano.db.services import environments
 from murano.db.services import instances
 from murano.db import session
 from murano.openstack.common.gettextutils import _
 from murano.openstack.common import log as logging
+from murano.openstack.common import service
 from murano.services import states
 
 
@@ -40,71 +45,77 @@ LOG = logging.getLogger(__name__)
 
 class ResultEndpoint(object):
     @staticmethod
-    def process_result(context, result, environment_id):
+    def process_result(context, result, environment_id, num_errors=None,
+                       num_warnings=None):
         secure_result = token_sanitizer.TokenSanitizer().sanitize(result)
         LOG.debug('Got result from orchestration '
                   'engine:\n{0}'.format(secure_result))
 
-        unit = session.get_session()
-        environment = unit.query(models.Environment).get(environment_id)
-
-        if not environment:
-            LOG.warning(_('Environment result could not be handled, specified '
-                          'environment was not found in database'))
-            return
-
         if result['Objects'] is None and result.get('ObjectsCopy', {}) is None:
             environments.EnvironmentServices.remove(environment_id)
             return
 
-        environment.description = result
-        if environment.description['Objects'] is not None:
-            environment.description['Objects']['services'] = \
-                environment.description['Objects'].pop('applications', [])
+        if result['Objects'] is not None:
+            result['Objects']['services'] = \
+                result['Objects'].pop('applications', [])
             # environment.networking = result.get('networking', {})
             action_name = 'Deployment'
             deleted = False
         else:
             action_name = 'Deletion'
             deleted = True
-        environment.version += 1
-        environment.save(unit)
-
-        #close deployment
-        deployment = get_last_deployment(unit, environment.id)
-        deployment.finished = timeutils.utcnow()
-
-        num_errors = unit.query(models.Status)\
-            .filter_by(level='error', task_id=deployment.id).count()
-        num_warnings = unit.query(models.Status)\
-            .filter_by(level='warning', task_id=deployment.id).count()
-
-        final_status_text = action_name + ' finished'
-        if num_errors:
-            final_status_text += " with errors"
-
-        elif num_warnings:
-            final_status_text += " with warnings"
-
-        status = models.Status()
-        status.task_id = deployment.id
-        status.text = final_status_text
-        status.level = 'info'
-        deployment.statuses.append(status)
-        deployment.save(unit)
-
-        #close session
-        conf_session = unit.query(models.Session).filter_by(
-            **{'environment_id': environment.id,
-               'state': states.SessionState.DEPLOYING if not deleted
-               else states.SessionState.DELETING}).first()
-        if num_errors > 0:
-            conf_session.state = \
-                states.SessionState.DELETE_FAILURE if deleted else \
-                states.SessionState.DEPLOY_FAILURE
-        else:
-            conf_session.state = states.SessionState.DEPLOYED
-        conf_session.save(unit)
+
+        # reports may still be buffered by any API process, so errors
+        # and warnings are counted by the engine that ran the task
+        count_stored = num_errors is None or num_warnings is None
+        if count_stored:
+            # engines of earlier releases do not send the counts
+            STATUS_REPORTS.flush()
+
+        unit = session.get_session()
+        with unit.begin():
+            environment = unit.query(models.Environment).get(environment_id)
+
+            if not environment:
+                LOG.warning(_('Environment result could not be handled, '
+                              'specified environment was not found in '
+                              'database'))
+                return
+
+            environment.description = result
+            environment.version += 1
+            unit.add(environment)
+
+            deployment, conf_session = get_last_deployment_with_session(
+                unit, environment.id,
+                states.SessionState.DELETING if deleted
+                else states.SessionState.DEPLOYING)
+
+            #close deployment
+            deployment.finished = timeutils.utcnow()
+            if count_stored:
+                num_errors, num_warnings = count_problems(unit, deployment.id)
+
+            final_status_text = action_name + ' finished'
+            if num_errors:
+                final_status_text += " with errors"
+
+            elif num_warnings:
+                final_status_text += " with warnings"
+
+            status = models.Status()
+            status.task_id = deployment.id
+            status.text = final_status_text
+            status.level = 'info'
+            unit.add(status)
+
+            #close session
+            if num_errors > 0:
+                conf_session.state = \
+                    states.SessionState.DELETE_FAILURE if deleted else \
+                    states.SessionState.DEPLOY_FAILURE
+            else:
+                conf_session.state = states.SessionState.DEPLOYED
 
         #output application tracking information
         message = '<EnvId: {0} TenantId: {1} Status: {2} Apps: {3}>'.format(
@@ -166,20 +177,89 @@ def untrack_instance(payload):
 def report_notification(report):
     LOG.debug('Got report from orchestration '
               'engine:\n{0}'.format(report))
+    STATUS_REPORTS.add(report)
+
+
+@notification_endpoint_wrapper()
+def report_notifications(payload):
+    LOG.debug('Got {0} reports from orchestration '
+              'engine'.format(len(payload['reports'])))
+    for report in payload['reports']:
+        STATUS_REPORTS.add(report)
+
+
+class StatusReportBuffer(object):
+    """Stores status reports of deployments in batches
+
+    Reports are kept for up to [status_reports] flush_interval
+    milliseconds or until flush_size of them are collected, and then are
+    saved with a single multi-row insert. The running deployments of the
+    environments are looked up once per batch, so reports always go to
+    the current deployment whichever API process handled its result.
+    """
+
+    def __init__(self):
+        self._reports = []
+        self._timer = None
+
+    def add(self, report):
+        now = timeutils.utcnow()
+        self._reports.append((report['environment_id'], {
+            'id': uuidutils.generate_uuid(),
+            'created': now,
+            'updated': now,
+            'entity_id': report['id'],
+            'text': report['text'],
+            'level': report['level'],
+            'details': report.get('details')
+        }))
+
+        if len(self._reports) >= config.CONF.status_reports.flush_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = eventlet.spawn_after(
+                config.CONF.status_reports.flush_interval / 1000.0,
+                self.flush)
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        reports, self._reports = self._reports, []
+        if not reports:
+            return
+
+        unit = session.get_session()
+        deployments = get_last_deployment_ids(
+            unit, set(environment_id for environment_id, _ in reports))
+        rows = []
+        for environment_id, row in reports:
+            row['task_id'] = deployments.get(environment_id)
+            if row['task_id'] is None:
+                LOG.warning(_('Status report could not be handled, there '
+                              'is no deployment of environment {0}').format(
+                    environment_id))
+            else:
+                rows.append(row)
+        if not rows:
+            return
 
-    report['entity_id'] = report['id']
-    del report['id']
+        table = models.Status.__table__
+        try:
+            with unit.begin():
+                unit.execute(table.insert().values(rows))
+        except Exception:
+            LOG.exception(_('Unable to store {0} status reports at once, '
+                            'storing them one by one').format(len(rows)))
+            for row in rows:
+                try:
+                    with unit.begin():
+                        unit.execute(table.insert().values(row))
+                except Exception:
+                    LOG.exception(_('Unable to store status report'))
 
-    status = models.Status()
-    status.update(report)
 
-    unit = session.get_session()
-    #connect with deployment
-    with unit.begin():
-        running_deployment = get_last_deployment(unit,
-                                                 status.environment_id)
-        status.task_id = running_deployment.id
-        unit.add(status)
+STATUS_REPORTS = StatusReportBuffer()
 
 
 def get_last_deployment(unit, env_id):
@@ -189,6 +269,44 @@ def get_last_deployment(unit, env_id):
     return query.first()
 
 
+def get_last_deployment_ids(unit, env_ids):
+    """Returns ids of last deployments of the environments by their ids"""
+    latest = unit.query(models.Task.environment_id,
+                        func.max(models.Task.started).label('started')) \
+        .filter(models.Task.environment_id.in_(env_ids)) \
+        .group_by(models.Task.environment_id) \
+        .subquery()
+    query = unit.query(models.Task.environment_id, models.Task.id) \
+        .join(latest, sa.and_(
+            models.Task.environment_id == latest.c.environment_id,
+            models.Task.started == latest.c.started))
+    return dict(query)
+
+
+def get_last_deployment_with_session(unit, env_id, session_state):
+    """Returns last deployment of the environment and its session
+
+    Both are fetched with a single query. The session is the one of the
+    environment in the given state, or None when there is no such session.
+    """
+    query = unit.query(models.Task, models.Session) \
+        .outerjoin(models.Session, sa.and_(
+            models.Session.environment_id == models.Task.environment_id,
+            models.Session.state == session_state)) \
+        .filter(models.Task.environment_id == env_id) \
+        .order_by(desc(models.Task.started))
+    return query.first() or (None, None)
+
+
+def count_problems(unit, deployment_id):
+    """Returns numbers of errors and warnings reported by the deployment"""
+    counts = dict(unit.query(models.Status.level, func.count(models.Status.id))
+                  .filter(models.Status.task_id == deployment_id,
+                          models.Status.level.in_(['error', 'warning']))
+                  .group_by(models.Status.level))
+    return counts.get('error', 0), counts.get('warning', 0)
+
+
 def _prepare_rpc_service(server_id):
     endpoints = [ResultEndpoint()]
 
@@ -198,7 +316,8 @@ def _prepare_rpc_service(server_id):
 
 
 def _prepare_notification_service(server_id):
-    endpoints = [report_notification, track_instance, untrack_instance]
+    endpoints = [report_notification, report_notifications,
+                 track_instance, untrack_instance]
 
     transport = messaging.get_transport(config.CONF)
     s_target = target.Target(topic='murano', server=server_id)
@@ -215,9 +334,34 @@ def get_rpc_service():
     return RPC_SERVICE
 
 
+class NotificationService(service.Service):
+    """Notification listener of the API
+
+    Status reports still buffered when the service stops are stored
+    before it finishes.
+    """
+
+    def __init__(self):
+        super(NotificationService, self).__init__()
+        self.server = None
+
+    def start(self):
+        super(NotificationService, self).start()
+        self.server = _prepare_notification_service(str(uuid.uuid4()))
+        self.server.start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.stop()
+            self.server.wait()
+            self.server = None
+        STATUS_REPORTS.flush()
+        super(NotificationService, self).stop()
+
+
 def get_notification_service():
     global NOTIFICATION_SERVICE
 
     if NOTIFICATION_SERVICE is None:
-        NOTIFICATION_SERVICE = _prepare_notification_service(str(uuid.uuid4()))
+        NOTIFICATION_SERVICE = NotificationService()
     return NOTIFICATION_SERVICE
@@ -660,7 +660,13 @@ class RequestDeserializer(object):
         return self.headers_deserializer.deserialize(request, action)
 
     def deserialize_body(self, request, action):
-        if not len(request.body) > 0:
+        # form data is parsed from the body stream by the deserializer,
+        # reading request.body would load the whole upload into memory
+        if request.content_type == 'multipart/form-data':
+            has_body = request.content_length != 0
+        else:
+            has_body = len(request.body) > 0
+        if not has_body:
             LOG.debug(_("Empty body provided in request"))
             return {}
 
@@ -12,9 +12,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import types
+
 from oslo.config import cfg
 from oslo.db.sqlalchemy import utils
 from sqlalchemy import or_
+from sqlalchemy import orm
 from sqlalchemy.orm import attributes
 # TODO(ruhe) use exception declared in openstack/common/db
 from webob import exc
@@ -34,11 +37,12 @@ SEARCH_MAPPING = {'fqn': 'fully_qualified_name',
 LOG = logging.getLogger(__name__)
 
 
-def _package_get(package_id_or_name, session):
+def _package_get(package_id_or_name, session, options=()):
     # TODO(sjmc7): update openstack/common and pull in
     # uuidutils, check that package_id_or_name resembles a
     # UUID before trying to treat it as one
-    package = session.query(models.Package).get(package_id_or_name)
+    query = session.query(models.Package).options(*options)
+    package = query.get(package_id_or_name)
     if not package:
         # Try using the FQN name instead. Since FQNs right now are unique,
         # don't need to do any logic to figure out if we have the right one.
@@ -46,7 +50,7 @@ def _package_get(package_id_or_name, session):
         #  Heat does this in nicer way, giving each stack an unambiguous ID of
         # stack_name/id and redirecting to it in the API. We need to do some
         # reworking for precedence rules later, so maybe take a look at this
-        package = session.query(models.Package).filter_by(
+        package = query.filter_by(
             fully_qualified_name=package_id_or_name
         ).first()
 
@@ -87,6 +91,23 @@ def package_get(package_id_or_name, context):
     return package
 
 
+def package_blob_get(package_id_or_name, context, column):
+    """Return one of the large columns of a package
+       Archive, logos and UI definition are deferred on the Package model,
+       so regular package queries never read them. This loads only the
+       requested column.
+       :param package_id_or_name: ID or name of a package, string
+       :param column: one of 'archive', 'logo', 'supplier_logo',
+                      'ui_definition'
+       :returns: column value
+    """
+    session = db_session.get_session()
+    package = _package_get(package_id_or_name, session,
+                           [orm.undefer(column)])
+    _authorize_package(package, context, allow_public=True)
+    return getattr(package, column)
+
+
 def _get_categories(category_names, session=None):
     """Return existing category objects or raise an exception.
 
@@ -283,8 +304,11 @@ def package_search(filters, context, limit=None):
         query = query.filter(pkg.tags.any(
             models.Tag.name.in_(filters['tag'])))
     if 'class_name' in filters.keys():
+        class_names = filters['class_name']
+        if isinstance(class_names, types.StringTypes):
+            class_names = [class_names]
         query = query.filter(pkg.class_definitions.any(
-            models.Class.name == filters['class_name']))
+            models.Class.name.in_(class_names)))
     if 'fqn' in filters.keys():
         query = query.filter(pkg.fully_qualified_name == filters['fqn'])
 
@@ -292,10 +316,11 @@ def package_search(filters, context, limit=None):
         fk_fields = {'categories': 'Category',
                      'tags': 'Tag',
                      'class_definitions': 'Class'}
+        blob_fields = ('archive', 'logo', 'supplier_logo')
         conditions = []
 
         for attr in dir(pkg):
-            if attr.startswith('_'):
+            if attr.startswith('_') or attr in blob_fields:
                 continue
             if isinstance(getattr(pkg, attr),
                           attributes.InstrumentedAttribute):
@@ -325,6 +350,29 @@ def package_search(filters, context, limit=None):
     return query.all()
 
 
+def class_packages_get(class_names, context):
+    """Find packages that define the given classes
+       Only enabled packages visible to the tenant are considered. Just the
+       columns required to resolve classes are selected, so package
+       archives, logos and UI definitions are never read.
+       :param class_names: names of classes to resolve, list
+       :returns: list of (class name, package id, package FQN, package
+                 update time) tuples ordered by package name
+    """
+    session = db_session.get_session()
+    pkg = models.Package
+    cls = models.Class
+
+    query = session.query(cls.name, pkg.id, pkg.fully_qualified_name,
+                          pkg.updated).join(pkg, cls.package_id == pkg.id)
+    query = query.filter(cls.name.in_(class_names)).filter(
+        pkg.__table__.c.enabled)
+    if not context.is_admin:
+        query = query.filter(or_(pkg.is_public,
+                                 pkg.owner_id == context.tenant))
+    return query.order_by(pkg.name, pkg.id).all()
+
+
 def package_upload(values, tenant_id):
     """Upload a package with new application
        :param values: parameters describing the new package
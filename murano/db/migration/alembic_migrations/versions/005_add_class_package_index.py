@@ -0,0 +1,39 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Add class name to package index to class_definition table.
+
+Revision ID: 005
+Revises: table class_definition
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+
+from alembic import op
+
+
+def upgrade():
+    op.create_index('ix_class_definition_name_package',
+                    'class_definition',
+                    ['name', 'package_id'])
+    ### end Alembic commands ###
+
+
+def downgrade():
+    op.drop_index('ix_class_definition_name_package',
+                  table_name='class_definition')
+    ### end Alembic commands ###
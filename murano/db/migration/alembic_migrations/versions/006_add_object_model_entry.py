@@ -0,0 +1,78 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Add object_model_entry table storing environment and session objects.
+
+Existing descriptions do not need to be converted: a description without
+references to object model entries is read as is and is split into
+entries on the next save.
+
+Revision ID: 006
+Revises: table object_model_entry
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+
+import collections
+
+from alembic import op
+from oslo.serialization import jsonutils
+import sqlalchemy as sa
+
+from murano.db import object_model
+
+MYSQL_ENGINE = 'InnoDB'
+MYSQL_CHARSET = 'utf8'
+
+
+def upgrade():
+    op.create_table(
+        'object_model_entry',
+        sa.Column('owner_id', sa.String(length=255), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('data', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('owner_id', 'key'),
+        mysql_engine=MYSQL_ENGINE,
+        mysql_charset=MYSQL_CHARSET
+    )
+    ### end Alembic commands ###
+
+
+def downgrade():
+    # assemble descriptions back before dropping the objects
+    engine = op.get_bind()
+    meta = sa.MetaData(bind=engine)
+    meta.reflect()
+    entries = meta.tables['object_model_entry']
+    fragments = collections.defaultdict(dict)
+    for row in engine.execute(entries.select()):
+        fragments[row.owner_id][row.key] = jsonutils.loads(row.data)
+
+    for table_name in ('environment', 'session'):
+        table = meta.tables[table_name]
+        select = sa.sql.select([table.c.id, table.c.description])
+        for row in engine.execute(select):
+            if row.id not in fragments:
+                continue
+            description = object_model.join(
+                jsonutils.loads(row.description), fragments[row.id])
+            engine.execute(table.update().where(
+                table.c.id == row.id).values(
+                    description=jsonutils.dumps(description)))
+
+    op.drop_table('object_model_entry')
+    ### end Alembic commands ###
@@ -20,8 +20,10 @@ from oslo.utils import timeutils
 import sqlalchemy as sa
 from sqlalchemy.ext import declarative
 from sqlalchemy import orm as sa_orm
+from sqlalchemy.orm import collections
 
 from murano.common import uuidutils
+from murano.db import object_model
 from murano.db.sqla import types as st
 
 
@@ -53,7 +55,75 @@ class _MuranoBase(models.ModelBase):
 Base = declarative.declarative_base(cls=_MuranoBase)
 
 
-class Environment(Base, TimestampMixin):
+class ObjectModelEntry(Base):
+    """Represents a single object of environment or session object model."""
+    __tablename__ = 'object_model_entry'
+
+    owner_id = sa.Column(sa.String(255), primary_key=True)
+    key = sa.Column(sa.String(255), primary_key=True)
+    data = sa.Column(st.JsonBlob(), nullable=False)
+
+
+class ObjectModelMixin(object):
+    """Stores object model description object by object.
+
+    The description column keeps only the skeleton of the object model
+    while every object is kept in its own ObjectModelEntry row, so saving
+    a modified description writes only the objects that were changed.
+    The assembled description is kept until it is assigned or the row is
+    loaded again, so changes made to it have to be saved by assigning it
+    back.
+    """
+
+    _description_cache = None
+
+    @declarative.declared_attr
+    def object_model_entries(cls):
+        return sa_orm.relationship(
+            ObjectModelEntry,
+            primaryjoin=lambda: cls.id == sa_orm.foreign(
+                ObjectModelEntry.owner_id),
+            collection_class=collections.attribute_mapped_collection('key'),
+            cascade='all, delete-orphan', lazy='joined')
+
+    @property
+    def description(self):
+        skeleton, entries = self._description, self.object_model_entries
+        cache = self._description_cache
+        # refresh or expiration loads new skeleton and entries objects
+        if cache is None or cache[0] is not skeleton \
+                or cache[1] is not entries:
+            fragments = dict((key, entry.data)
+                             for key, entry in entries.iteritems())
+            cache = (skeleton, entries,
+                     object_model.join(skeleton, fragments))
+            self._description_cache = cache
+        return cache[2]
+
+    @description.setter
+    def description(self, value):
+        skeleton, fragments = object_model.split(value)
+        entries = self.object_model_entries
+        for key in set(entries).difference(fragments):
+            del entries[key]
+        for key, fragment in fragments.iteritems():
+            entry = entries.get(key)
+            if entry is None:
+                entries[key] = ObjectModelEntry(key=key, data=fragment)
+            elif entry.data != fragment:
+                entry.data = fragment
+        self._description = skeleton
+        self._description_cache = (skeleton, entries, value)
+
+    def to_dict(self):
+        dictionary = super(ObjectModelMixin, self).to_dict()
+        dictionary.pop('_description', None)
+        dictionary.pop('_description_cache', None)
+        dictionary.pop('object_model_entries', None)
+        return dictionary
+
+
+class Environment(ObjectModelMixin, Base, TimestampMixin):
     """Represents a Environment in the metadata-store."""
     __tablename__ = 'environment'
 
@@ -63,7 +133,8 @@ class Environment(Base, TimestampMixin):
     name = sa.Column(sa.String(255), nullable=False)
     tenant_id = sa.Column(sa.String(36), nullable=False)
     version = sa.Column(sa.BigInteger, nullable=False, default=0)
-    description = sa.Column(st.JsonBlob(), nullable=False, default={})
+    _description = sa.Column('description', st.JsonBlob(), nullable=False,
+                             default={})
     networking = sa.Column(st.JsonBlob(), nullable=True, default={})
 
     sessions = sa_orm.relationship("Session", backref='environment',
@@ -72,13 +143,8 @@ class Environment(Base, TimestampMixin):
     tasks = sa_orm.relationship('Task', backref='environment',
                                 cascade='save-update, merge, delete')
 
-    def to_dict(self):
-        dictionary = super(Environment, self).to_dict()
-        del dictionary['description']
-        return dictionary
 
-
-class Session(Base, TimestampMixin):
+class Session(ObjectModelMixin, Base, TimestampMixin):
     __tablename__ = 'session'
 
     id = sa.Column(sa.String(36),
@@ -88,12 +154,11 @@ class Session(Base, TimestampMixin):
 
     user_id = sa.Column(sa.String(36), nullable=False)
     state = sa.Column(sa.String(36), nullable=False)
-    description = sa.Column(st.JsonBlob(), nullable=False)
+    _description = sa.Column('description', st.JsonBlob(), nullable=False)
     version = sa.Column(sa.BigInteger, nullable=False, default=0)
 
     def to_dict(self):
         dictionary = super(Session, self).to_dict()
-        del dictionary['description']
         #object relations may be not loaded yet
         if 'environment' in dictionary:
             del dictionary['environment']
@@ -210,7 +275,7 @@ class Package(Base, TimestampMixin):
     id = sa.Column(sa.String(36),
                    primary_key=True,
                    default=uuidutils.generate_uuid)
-    archive = sa.Column(st.LargeBinary())
+    archive = sa_orm.deferred(sa.Column(st.LargeBinary()))
     fully_qualified_name = sa.Column(sa.String(128),
                                      nullable=False,
                                      index=True,
@@ -228,10 +293,10 @@ class Package(Base, TimestampMixin):
                                secondary=package_to_tag,
                                cascade='save-update, merge',
                                lazy='joined')
-    logo = sa.Column(st.LargeBinary(), nullable=True)
+    logo = sa_orm.deferred(sa.Column(st.LargeBinary(), nullable=True))
     owner_id = sa.Column(sa.String(36), nullable=False)
-    ui_definition = sa.Column(sa.Text)
-    supplier_logo = sa.Column(sa.LargeBinary, nullable=True)
+    ui_definition = sa_orm.deferred(sa.Column(sa.Text))
+    supplier_logo = sa_orm.deferred(sa.Column(sa.LargeBinary, nullable=True))
     categories = sa_orm.relationship("Category",
                                      secondary=package_to_category,
                                      cascade='save-update, merge',
@@ -278,6 +343,8 @@ class Tag(Base, TimestampMixin):
 class Class(Base, TimestampMixin):
     """Represents a class definition in the datastore."""
     __tablename__ = 'class_definition'
+    __table_args__ = (sa.Index('ix_class_definition_name_package',
+                               'name', 'package_id'),)
 
     id = sa.Column(sa.String(36),
                    primary_key=True,
@@ -288,7 +355,7 @@ class Class(Base, TimestampMixin):
 
 def register_models(engine):
     """Creates database tables for all models with the given engine."""
-    models = (Environment, Status, Session, Task,
+    models = (Environment, Status, Session, Task, ObjectModelEntry,
               ApiStats, Package, Category, Class, Instance)
     for model in models:
         model.metadata.create_all(engine)
@@ -296,7 +363,7 @@ def register_models(engine):
 
 def unregister_models(engine):
     """Drops database tables for all models with the given engine."""
-    models = (Environment, Status, Session, Task,
+    models = (Environment, Status, Session, Task, ObjectModelEntry,
               ApiStats, Package, Category, Class)
     for model in models:
         model.metadata.drop_all(engine)
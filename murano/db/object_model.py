@@ -0,0 +1,71 @@
+#    Copyright (c) 2015 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Splitting of object model documents into separately stored objects.
+
+Every object of the model (a dictionary with '?' section holding an id) is
+cut out of the document and replaced with a reference to it. Objects are
+keyed by the top-level section they belong to and their id, because the
+same object usually appears both in 'Objects' and in 'ObjectsCopy'. What is
+left of the document after all the objects are cut out is the skeleton.
+"""
+
+import types
+
+REF_KEY = '?ref'
+
+
+def split(document):
+    """Split object model document into skeleton and objects
+
+       :param document: object model, dict
+       :returns: tuple of skeleton and dict of objects by their keys
+    """
+    fragments = {}
+    if not isinstance(document, types.DictionaryType):
+        return document, fragments
+    skeleton = dict(
+        (section, _extract(value, section, fragments))
+        for section, value in document.iteritems())
+    return skeleton, fragments
+
+
+def join(skeleton, fragments):
+    """Assemble object model document back from the skeleton and objects"""
+    if isinstance(skeleton, types.DictionaryType):
+        if len(skeleton) == 1 and REF_KEY in skeleton:
+            return join(fragments.get(skeleton[REF_KEY]), fragments)
+        return dict((key, join(value, fragments))
+                    for key, value in skeleton.iteritems())
+    elif isinstance(skeleton, types.ListType):
+        return [join(value, fragments) for value in skeleton]
+    return skeleton
+
+
+def _extract(value, section, fragments):
+    if isinstance(value, types.DictionaryType):
+        result = dict((key, _extract(val, section, fragments))
+                      for key, val in value.iteritems())
+        sys_dict = value.get('?')
+        if isinstance(sys_dict, types.DictionaryType) and \
+                isinstance(sys_dict.get('id'), types.StringTypes):
+            key = u'{0}/{1}'.format(section, sys_dict['id'])
+            if key not in fragments:
+                fragments[key] = result
+                return {REF_KEY: key}
+        return result
+    elif isinstance(value, types.ListType):
+        return [_extract(val, section, fragments) for val in value]
+    return value
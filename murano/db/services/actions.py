@@ -36,5 +36,6 @@ def update_task(action, session, task, unit):
     status.level = 'info'
     task_info.statuses.append(status)
     with unit.begin():
-        unit.add(session)
+        # session was created by another unit which may still be alive
+        unit.merge(session)
         unit.add(task_info)
@@ -128,7 +128,8 @@ class MuranoClassLoader(object):
             else:
                 mpc_name = 'mpc' + helpers.generate_id()
                 bases = (cls, murano_object.MuranoObject)
-                m_class.object_class = type(mpc_name, bases, {})
+                m_class.object_class = type(
+                    mpc_name, bases, {'__slots__': ()})
 
         for item in dir(cls):
             method = getattr(cls, item)
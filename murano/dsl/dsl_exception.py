@@ -12,9 +12,76 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import inspect
+import os.path
 import sys
 
-import murano.dsl.yaql_functions as yaql_functions
+import murano.dsl.helpers as helpers
+import murano.dsl.yaql_expression as yaql_expression
+
+
+def capture_frames(context):
+    frames = []
+    while context:
+        frames.append((helpers.get_current_instruction(context),
+                       helpers.get_current_method(context),
+                       helpers.get_type(context)))
+        context = helpers.get_caller_context(context)
+    if frames:
+        frames.pop()
+    frames.reverse()
+    return frames
+
+
+def compose_frame(instruction, method, murano_class):
+    return {
+        'instruction': None if instruction is None
+        else str(instruction),
+
+        'location': None if instruction is None
+        else instruction.source_file_position,
+
+        'method': method,
+        'class': murano_class
+    }
+
+
+def compose_frames(frames, native_traceback):
+    result = [compose_frame(*frame) for frame in frames]
+    for frame in inspect.getinnerframes(native_traceback)[1:]:
+        location = yaql_expression.YaqlExpressionFilePosition(
+            os.path.abspath(frame[1]), frame[2],
+            -1, -1, -1, -1, -1)
+        method = frame[3]
+        result.append({
+            'instruction': frame[4][0].strip(),
+            'location': location,
+            'method': method,
+            'class': None
+        })
+    return result
+
+
+class CapturedStackTrace(object):
+    """Call stack captured without creating a StackTrace object
+
+    Capturing only collects the instructions of the MuranoPL call stack and
+    keeps the traceback of the native exception. Frames are composed and
+    source lines are read only when the StackTrace object is requested.
+    """
+
+    def __init__(self, context, native_traceback=None):
+        self._context = context
+        self._frames = capture_frames(context)
+        self._native_traceback = native_traceback
+
+    def create(self):
+        class_loader = helpers.get_class_loader(self._context)
+        stack_trace = class_loader.get_class('io.murano.StackTrace').new(
+            None, helpers.get_object_store(self._context), self._context)
+        stack_trace.set_property('frames', compose_frames(
+            self._frames, self._native_traceback))
+        return stack_trace
 
 
 class MuranoPlException(Exception):
@@ -39,6 +106,8 @@ class MuranoPlException(Exception):
 
     @property
     def stacktrace(self):
+        if isinstance(self._stacktrace, CapturedStackTrace):
+            self._stacktrace = self._stacktrace.create()
         return self._stacktrace
 
     @property
@@ -51,14 +120,14 @@ class MuranoPlException(Exception):
 
     @staticmethod
     def from_python_exception(exception, context):
-        stacktrace = yaql_functions.new('io.murano.StackTrace', context)
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        stacktrace = CapturedStackTrace(context, exc_traceback)
         exception_type = type(exception)
         names = ['{0}.{1}'.format(exception_type.__module__,
                                   exception_type.__name__)]
 
         result = MuranoPlException(
             names, str(exception), stacktrace)
-        exc_type, exc_value, exc_traceback = sys.exc_info()
         result.original_exception = exception
         result.original_traceback = exc_traceback
         return result
@@ -14,9 +14,10 @@
 
 import collections
 import inspect
+import itertools
+import logging as std_logging
 import sys
 import types
-import uuid
 
 import eventlet
 import eventlet.event
@@ -37,6 +38,30 @@ from murano.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
+MAX_INLINE_CALL_DEPTH = 10
+
+_thread_markers = itertools.count(1)
+
+
+class _MethodLock(object):
+    """Lock of a method of an object held by a MuranoPL thread
+
+    The thread holding the lock may call the method again, other
+    threads wait until it is released.
+    """
+
+    __slots__ = ('owner', '_event')
+
+    def __init__(self, owner):
+        self.owner = owner
+        self._event = eventlet.event.Event()
+
+    def wait(self):
+        self._event.wait()
+
+    def release(self):
+        self._event.send()
+
 
 class MuranoDslExecutor(object):
     def __init__(self, class_loader, environment=None):
@@ -50,6 +75,7 @@ class MuranoDslExecutor(object):
         self._root_context.set_data(self._object_store, '?objectStore')
         self._root_context.set_data(self._attribute_store, '?attributeStore')
         self._locks = {}
+        self._class_contexts = {}
         yaql_functions.register(self._root_context)
         self._root_context = yaql.context.Context(self._root_context)
 
@@ -108,62 +134,77 @@ class MuranoDslExecutor(object):
 
         murano_class = method.murano_class
         current_thread = eventlet.greenthread.getcurrent()
-        if not hasattr(current_thread, '_muranopl_thread_marker'):
+        thread_marker = getattr(current_thread, '_muranopl_thread_marker',
+                                None)
+        if thread_marker is None:
             thread_marker = current_thread._muranopl_thread_marker = \
-                uuid.uuid4().hex
-        else:
-            thread_marker = current_thread._muranopl_thread_marker
-
-        method_id = id(body)
-        this_id = this.object_id
-
-        while True:
-            event, marker = self._locks.get((method_id, this_id), (None, None))
-            if event:
-                if marker == thread_marker:
-                    return self._invoke_method_implementation_gt(
-                        body, this, params, murano_class, context)
-                event.wait()
-            else:
-                break
+                next(_thread_markers)
+
+        lock_key = (id(body), this.object_id)
+        lock = self._locks.get(lock_key)
+        if lock is not None and lock.owner == thread_marker:
+            return self._run_method_body(
+                current_thread, body, this, params, murano_class, context)
+        while lock is not None:
+            lock.wait()
+            lock = self._locks.get(lock_key)
+        lock = self._locks[lock_key] = _MethodLock(thread_marker)
 
-        event = eventlet.event.Event()
-        self._locks[(method_id, this_id)] = (event, thread_marker)
+        try:
+            if LOG.isEnabledFor(std_logging.DEBUG):
+                return self._run_traced_method_body(
+                    thread_marker, method, current_thread, body, this,
+                    params, murano_class, context)
+            return self._run_method_body(
+                current_thread, body, this, params, murano_class, context)
+        finally:
+            del self._locks[lock_key]
+            lock.release()
+
+    def _run_traced_method_body(self, thread_marker, method, current_thread,
+                                body, this, params, murano_class, context):
         # noinspection PyProtectedMember
-        method_info = '{0}.{1} ({2})'.format(murano_class.name, method._name,
-                                             hash((method_id, this_id)))
+        method_name = method._name
         # Prepare caller information
         caller_ctx = helpers.get_caller_context(context)
         if caller_ctx:
             caller_info = trace.compose_stack_frame(caller_ctx)
-            LOG.debug(
-                '{0}: Begin execution: {1} called from {2}'.format(
-                    thread_marker, method_info, trace.format_frame(
-                        caller_info)))
+            LOG.debug('%s: Begin execution: %s.%s called from %s',
+                      thread_marker, murano_class.name, method_name,
+                      trace.format_frame(caller_info))
         else:
-            LOG.debug(
-                '{0}: Begin execution: {1}'.format(
-                    thread_marker, method_info))
+            LOG.debug('%s: Begin execution: %s.%s',
+                      thread_marker, murano_class.name, method_name)
 
         try:
-            gt = eventlet.spawn(self._invoke_method_implementation_gt, body,
-                                this, params, murano_class, context,
-                                thread_marker)
-            result = gt.wait()
+            result = self._run_method_body(
+                current_thread, body, this, params, murano_class, context)
         except Exception as e:
-            LOG.debug(
-                "{0}: End execution: {1} with exception {2}".format(
-                    thread_marker, method_info, e))
+            LOG.debug('%s: End execution: %s.%s with exception %s',
+                      thread_marker, murano_class.name, method_name, e)
             raise
-        else:
-            LOG.debug(
-                "{0}: End execution: {1}".format(thread_marker, method_info))
-        finally:
-            del self._locks[(method_id, this_id)]
-            event.send()
-
+        LOG.debug('%s: End execution: %s.%s',
+                  thread_marker, murano_class.name, method_name)
         return result
 
+    def _run_method_body(self, current_thread, body, this, params,
+                         murano_class, context):
+        # Method bodies run in the calling green thread. Only every
+        # MAX_INLINE_CALL_DEPTH nested calls a new green thread is spawned
+        # to get a fresh stack so that deep call chains do not exhaust it.
+        depth = getattr(current_thread, '_muranopl_call_depth', 0)
+        if depth >= MAX_INLINE_CALL_DEPTH:
+            return eventlet.spawn(
+                self._invoke_method_implementation_gt, body, this, params,
+                murano_class, context,
+                current_thread._muranopl_thread_marker).wait()
+        current_thread._muranopl_call_depth = depth + 1
+        try:
+            return self._invoke_method_implementation_gt(
+                body, this, params, murano_class, context)
+        finally:
+            current_thread._muranopl_call_depth = depth
+
     def _invoke_method_implementation_gt(self, body, this,
                                          params, murano_class, context,
                                          thread_marker=None):
@@ -225,15 +266,14 @@ class MuranoDslExecutor(object):
 
         return parameter_values
 
-    def _create_context(self, this, murano_class, context, **kwargs):
-        new_context = self._class_loader.create_local_context(
+    def _get_class_context(self, murano_class):
+        class_context = self._class_contexts.get(murano_class)
+        if class_context is not None:
+            return class_context
+
+        class_context = self._class_loader.create_local_context(
             parent_context=self._root_context,
             murano_class=murano_class)
-        new_context.set_data(this)
-        new_context.set_data(this, 'this')
-        new_context.set_data(this, '?this')
-        new_context.set_data(murano_class, '?type')
-        new_context.set_data(context, '?callerContext')
 
         @yaql.context.EvalArg('obj', arg_type=murano_object.MuranoObject)
         @yaql.context.EvalArg('property_name', arg_type=str)
@@ -246,8 +286,19 @@ class MuranoDslExecutor(object):
             return murano_class.namespace_resolver.resolve_name(
                 '%s:%s' % (prefix, name))
 
-        new_context.register_function(obj_attribution, '#operator_.')
-        new_context.register_function(validate, '#validate')
+        class_context.register_function(obj_attribution, '#operator_.')
+        class_context.register_function(validate, '#validate')
+        self._class_contexts[murano_class] = class_context
+        return class_context
+
+    def _create_context(self, this, murano_class, context, **kwargs):
+        new_context = yaql.context.Context(
+            parent_context=self._get_class_context(murano_class))
+        new_context.set_data(this)
+        new_context.set_data(this, 'this')
+        new_context.set_data(this, '?this')
+        new_context.set_data(murano_class, '?type')
+        new_context.set_data(context, '?callerContext')
         for key, value in kwargs.iteritems():
             new_context.set_data(value, key)
         return new_context
@@ -270,14 +321,23 @@ class MuranoDslExecutor(object):
         objects_copy = data.get('ObjectsCopy')
         if not objects_copy:
             return
-        gc_object_store = object_store.ObjectStore(self._class_loader)
-        gc_object_store.load(objects_copy, None, self._root_context)
-        objects_to_clean = []
-        for object_id in self._list_potential_object_ids(objects_copy):
-            if gc_object_store.has(object_id) \
-                    and not self._object_store.has(object_id):
-                obj = gc_object_store.get(object_id)
-                objects_to_clean.append(obj)
+        vanished_ids = [
+            object_id for object_id
+            in self._list_potential_object_ids(objects_copy)
+            if not self._object_store.has(object_id)]
+        if not vanished_ids:
+            return
+
+        gc_object_store = object_store.ObjectStore(
+            self._class_loader, parent_store=self._object_store)
+        gc_object_store.load_detached(
+            [(value, self._object_store.get(owner_id))
+             for value, owner_id in self._list_vanished_subtrees(
+                 objects_copy, set(vanished_ids))],
+            self._root_context)
+        objects_to_clean = [
+            gc_object_store.get(object_id) for object_id in vanished_ids
+            if gc_object_store.has(object_id)]
         if objects_to_clean:
             backup = self._object_store
             try:
@@ -289,6 +349,32 @@ class MuranoDslExecutor(object):
             finally:
                 self._object_store = backup
 
+    def _list_vanished_subtrees(self, data, vanished_ids, owner_id=None):
+        """Yields top-most vanished objects together with their owner ids
+
+        Objects nested into a vanished object are loaded by their owner
+        and thus are not reported.
+        """
+        if isinstance(data, types.DictionaryType):
+            sys_dict = data.get('?')
+            if isinstance(sys_dict, types.DictionaryType) \
+                    and sys_dict.get('id') \
+                    and sys_dict.get('type'):
+                if sys_dict['id'] in vanished_ids:
+                    yield data, owner_id
+                    return
+                owner_id = sys_dict['id']
+            for val in data.values():
+                for res in self._list_vanished_subtrees(
+                        val, vanished_ids, owner_id):
+                    yield res
+        elif isinstance(data, collections.Iterable) and not isinstance(
+                data, types.StringTypes):
+            for val in data:
+                for res in self._list_vanished_subtrees(
+                        val, vanished_ids, owner_id):
+                    yield res
+
     def _list_potential_object_ids(self, data):
         if isinstance(data, types.DictionaryType):
             for val in data.values():
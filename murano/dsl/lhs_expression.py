@@ -14,7 +14,6 @@
 
 import types
 
-import yaql
 import yaql.context
 import yaql.expressions
 
@@ -40,7 +39,7 @@ class LhsExpression(object):
                                    yaql.expressions.Expression)):
             self._expression = expression
         else:
-            self._expression = yaql.parse(str(expression))
+            self._expression = yaql_expression.parse(expression)
         self._current_obj = None
         self._current_obj_name = None
 
@@ -14,6 +14,7 @@
 
 import collections
 import inspect
+import weakref
 
 import murano.dsl.exceptions as exceptions
 import murano.dsl.helpers as helpers
@@ -38,7 +39,8 @@ class MuranoClass(object):
         self._namespace_resolver = namespace_resolver
         self._name = namespace_resolver.resolve_name(name)
         self._properties = {}
-        self._config = {}
+        self._property_keys = {}
+        self._config = None
         if self._name == 'io.murano.Object':
             self._parents = []
         else:
@@ -49,7 +51,16 @@ class MuranoClass(object):
         parents_class = [p.object_class for p in self._parents]
         bases = tuple(parents_class) or (murano_object.MuranoObject,)
 
-        self.object_class = type(class_name, bases, {})
+        self.object_class = type(class_name, bases, {'__slots__': ()})
+
+        self._mro = self._linearize()
+        self._ancestors = frozenset(self._mro)
+        self._lookup_cache = {}
+        # cached lookups of descendants become stale when methods or
+        # properties are added to the class
+        self._subclasses = weakref.WeakSet()
+        for parent in self._parents:
+            parent._subclasses.add(self)
 
     @property
     def name(self):
@@ -67,6 +78,11 @@ class MuranoClass(object):
     def parents(self):
         return self._parents
 
+    @property
+    def mro(self):
+        """Class itself and all its ancestors in breadth-first order"""
+        return self._mro
+
     @property
     def methods(self):
         return self._methods
@@ -77,6 +93,7 @@ class MuranoClass(object):
     def add_method(self, name, payload):
         method = murano_method.MuranoMethod(self, name, payload)
         self._methods[name] = method
+        self._invalidate_lookups()
         return method
 
     @property
@@ -87,10 +104,28 @@ class MuranoClass(object):
         if not isinstance(property_typespec, typespec.PropertySpec):
             raise TypeError('property_typespec')
         self._properties[name] = property_typespec
+        self._invalidate_lookups()
 
     def get_property(self, name):
         return self._properties[name]
 
+    def get_property_key(self, name):
+        """Returns key of the property in object property store
+
+        Keys are shared by all objects of the class.
+        """
+        key = self._property_keys.get(name)
+        if key is None:
+            key = self._property_keys.setdefault(name, (self, name))
+        return key
+
+    @property
+    def config(self):
+        if self._config is None:
+            config = self._class_loader.get_class_config(self._name)
+            self._config = config if isinstance(config, dict) else {}
+        return self._config
+
     def _find_method_chains(self, name):
         initial = [self.methods[name]] if name in self.methods else []
         yielded = False
@@ -110,7 +145,34 @@ class MuranoClass(object):
             lambda x, y: x + y,
             [p.find_method(name) for p in self._parents])))
 
+    def _linearize(self):
+        result = []
+        queue = collections.deque([self])
+        while queue:
+            c = queue.popleft()
+            if c not in result:
+                result.append(c)
+                queue.extend(c.parents)
+        return result
+
+    def _invalidate_lookups(self):
+        if self._lookup_cache:
+            self._lookup_cache = {}
+        for subclass in list(self._subclasses):
+            subclass._invalidate_lookups()
+
+    def _get_lookup_table(self, kind):
+        return self._lookup_cache.setdefault(kind, {})
+
     def find_single_method(self, name):
+        table = self._get_lookup_table('single_method')
+        method = table.get(name)
+        if method is None:
+            method = self._resolve_single_method(name)
+            table[name] = method
+        return method
+
+    def _resolve_single_method(self, name):
         chains = sorted(self._find_method_chains(name), key=lambda t: len(t))
         result = []
 
@@ -139,27 +201,72 @@ class MuranoClass(object):
         return result[0]
 
     def find_all_methods(self, name):
-        result = []
-        queue = collections.deque([self])
-        while queue:
-            c = queue.popleft()
-            if name in c.methods:
-                method = c.methods[name]
-                if method not in result:
-                    result.append(method)
-            queue.extend(c.parents)
-        return result
+        table = self._get_lookup_table('all_methods')
+        result = table.get(name)
+        if result is None:
+            result = [c.methods[name] for c in self._mro if name in c.methods]
+            table[name] = result
+        return list(result)
 
     def find_property(self, name):
-        result = []
-        types = collections.deque([self])
-        while len(types) > 0:
-            mc = types.popleft()
-            if name in mc.properties and mc not in result:
-                result.append(mc)
-            types.extend(mc.parents)
+        table = self._get_lookup_table('property')
+        result = table.get(name)
+        if result is None:
+            result = [c for c in self._mro if name in c._properties]
+            table[name] = result
+        return list(result)
+
+    def find_property_reader(self, name, caller_class=None):
+        """Returns class whose part of the object stores property value"""
+        table = self._get_lookup_table('property_reader')
+        key = (name, caller_class)
+        result = table.get(key)
+        if result is None:
+            result = self._resolve_property_reader(name, caller_class)
+            table[key] = result
         return result
 
+    def _resolve_property_reader(self, name, caller_class):
+        start_type, derived = self, False
+        if caller_class is not None and caller_class.is_compatible(self):
+            start_type, derived = caller_class, True
+        if name in start_type._properties:
+            return start_type
+        declared_properties = start_type.find_property(name)
+        if len(declared_properties) == 1:
+            return declared_properties[0]
+        elif len(declared_properties) > 1:
+            raise exceptions.AmbiguousPropertyNameError(name)
+        elif derived:
+            return caller_class
+        else:
+            raise exceptions.PropertyReadError(name, start_type)
+
+    def find_property_writers(self, name, caller_class=None):
+        """Returns classes that declare property written by caller_class
+
+        Result is a (classes, derived) pair. Empty list of classes means
+        that an undeclared property is stored in the caller_class part.
+        """
+        table = self._get_lookup_table('property_writers')
+        key = (name, caller_class)
+        result = table.get(key)
+        if result is None:
+            result = self._resolve_property_writers(name, caller_class)
+            table[key] = result
+        return result
+
+    def _resolve_property_writers(self, name, caller_class):
+        start_type, derived = self, False
+        if caller_class is not None and caller_class.is_compatible(self):
+            start_type, derived = caller_class, True
+        if start_type.find_property(name):
+            return self.find_property(name), derived
+        elif derived:
+            return [], derived
+        else:
+            raise exceptions.PropertyWriteError(name, start_type)
+
     def invoke(self, name, executor, this, parameters):
         if not self.is_compatible(this):
             raise Exception("'this' must be of compatible type")
@@ -168,13 +275,8 @@ class MuranoClass(object):
 
     def is_compatible(self, obj):
         if isinstance(obj, murano_object.MuranoObject):
-            return self.is_compatible(obj.type)
-        if obj is self:
-            return True
-        for parent in obj.parents:
-            if self.is_compatible(parent):
-                return True
-        return False
+            obj = obj.type
+        return self in obj._ancestors
 
     def new(self, owner, object_store, context, parameters=None,
             object_id=None, **kwargs):
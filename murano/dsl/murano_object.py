@@ -21,7 +21,25 @@ import murano.dsl.type_scheme as type_scheme
 import murano.dsl.typespec as typespec
 
 
+def _has_references(value):
+    if isinstance(value, type_scheme.ObjRef):
+        return True
+    elif isinstance(value, dict):
+        return any(_has_references(key) or _has_references(item)
+                   for key, item in value.iteritems())
+    elif isinstance(value, list):
+        return any(_has_references(item) for item in value)
+    return False
+
+
 class MuranoObject(object):
+    # Object is made of parts, one per class in its hierarchy. Parts share
+    # a single property store keyed by (declaring class, property name)
+    # and a map of all parts so that they stay small.
+    __slots__ = ('__type', '__owner', '__object_id', '__object_store',
+                 '__context', '__defaults', '__this', '__parts',
+                 '__properties', '__initialized')
+
     def __init__(self, murano_class, owner, object_store, context,
                  object_id=None, known_classes=None, defaults=None, this=None):
 
@@ -30,36 +48,33 @@ class MuranoObject(object):
         self.__owner = owner
         self.__object_id = object_id or murano.dsl.helpers.generate_id()
         self.__type = murano_class
-        self.__properties = {}
         self.__object_store = object_store
-        self.__parents = {}
+        self.__parts = known_classes
         self.__context = context
         self.__defaults = defaults or {}
         self.__this = this
-        self.__config = object_store.class_loader.get_class_config(
-            murano_class.name)
-        if not isinstance(self.__config, dict):
-            self.__config = {}
+        self.__initialized = False
+        if this is None:
+            self.__properties = {}
+        else:
+            self.__properties = this.__properties
         known_classes[murano_class.name] = self
         for parent_class in murano_class.parents:
             name = parent_class.name
             if name not in known_classes:
-                obj = parent_class.new(owner, object_store, context,
-                                       None, object_id=self.__object_id,
-                                       known_classes=known_classes,
-                                       defaults=defaults, this=self.real_this)
-
-                self.__parents[name] = known_classes[name] = obj
-            else:
-                self.__parents[name] = known_classes[name]
+                parent_class.new(owner, object_store, context,
+                                 None, object_id=self.__object_id,
+                                 known_classes=known_classes,
+                                 defaults=defaults, this=self.real_this)
 
     def initialize(self, **kwargs):
+        config = self.__type.config
         used_names = set()
         for property_name in self.__type.properties:
             spec = self.__type.get_property(property_name)
             if spec.usage == typespec.PropertyUsages.Config:
-                if property_name in self.__config:
-                    property_value = self.__config[property_name]
+                if property_name in config:
+                    property_value = config[property_name]
                 else:
                     property_value = type_scheme.NoValue
                 self.set_property(property_name, property_value)
@@ -69,28 +84,57 @@ class MuranoObject(object):
                 spec = self.__type.get_property(property_name)
                 if spec.usage == typespec.PropertyUsages.Config:
                     continue
-                needs_evaluation = murano.dsl.helpers.needs_evaluation
-                if i == 0 and needs_evaluation(spec.default) or i == 1\
+                if i == 0 and spec.default_needs_evaluation or i == 1\
                         and property_name in used_names:
                     continue
                 used_names.add(property_name)
-                if spec.usage == typespec.PropertyUsages.Runtime:
-                    if not spec.has_default:
-                        continue
-                    property_value = type_scheme.NoValue
-                else:
-                    property_value = kwargs.get(property_name,
-                                                type_scheme.NoValue)
-                try:
-                    self.set_property(property_name, property_value)
-                except exceptions.ContractViolationException:
-                    if spec.usage != typespec.PropertyUsages.Runtime:
-                        raise
-
-        for parent in self.__parents.values():
-            parent.initialize(**kwargs)
+                self._initialize_property(property_name, spec, kwargs)
+
+        for parent_class in self.__type.parents:
+            self.__parts[parent_class.name].initialize(**kwargs)
         self.__initialized = True
 
+    def resolve_references(self, **kwargs):
+        """Initializes again properties that reference unloaded objects
+
+        While the object store loads a model, references to objects that
+        are not loaded yet are kept as ObjRef. Once the whole model is
+        loaded, only properties holding such references and properties
+        with evaluated defaults, that might have used them, are set again.
+        """
+        for property_name in self.__type.properties:
+            spec = self.__type.get_property(property_name)
+            if spec.usage == typespec.PropertyUsages.Config:
+                continue
+            if spec.default_needs_evaluation and \
+                    property_name not in kwargs:
+                continue
+            key = self.__type.get_property_key(property_name)
+            if _has_references(self.__properties.get(key)):
+                self._initialize_property(property_name, spec, kwargs)
+        for property_name in self.__type.properties:
+            spec = self.__type.get_property(property_name)
+            if spec.usage != typespec.PropertyUsages.Config and \
+                    spec.default_needs_evaluation and \
+                    property_name not in kwargs:
+                self._initialize_property(property_name, spec, kwargs)
+
+        for parent_class in self.__type.parents:
+            self.__parts[parent_class.name].resolve_references(**kwargs)
+
+    def _initialize_property(self, name, spec, kwargs):
+        if spec.usage == typespec.PropertyUsages.Runtime:
+            if not spec.has_default:
+                return
+            value = type_scheme.NoValue
+        else:
+            value = kwargs.get(name, type_scheme.NoValue)
+        try:
+            self.set_property(name, value)
+        except exceptions.ContractViolationException:
+            if spec.usage != typespec.PropertyUsages.Runtime:
+                raise
+
     @property
     def object_id(self):
         return self.__object_id
@@ -114,72 +158,56 @@ class MuranoObject(object):
         return self.get_property(item)
 
     def get_property(self, name, caller_class=None):
-        start_type, derived = self.__type, False
-        if caller_class is not None and caller_class.is_compatible(self):
-            start_type, derived = caller_class, True
-        if name in start_type.properties:
-            return self.cast(start_type)._get_property_value(name)
-        else:
-            declared_properties = start_type.find_property(name)
-            if len(declared_properties) == 1:
-                return self.cast(declared_properties[0]).__properties[name]
-            elif len(declared_properties) > 1:
-                raise exceptions.AmbiguousPropertyNameError(name)
-            elif derived:
-                return self.cast(caller_class)._get_property_value(name)
-            else:
-                raise exceptions.PropertyReadError(name, start_type)
-
-    def _get_property_value(self, name):
+        owner_class = self.__type.find_property_reader(name, caller_class)
         try:
-            return self.__properties[name]
+            return self.__properties[owner_class.get_property_key(name)]
         except KeyError:
             raise exceptions.UninitializedPropertyAccessError(
-                name, self.__type)
+                name, owner_class)
 
     def set_property(self, name, value, caller_class=None):
-        start_type, derived = self.__type, False
-        if caller_class is not None and caller_class.is_compatible(self):
-            start_type, derived = caller_class, True
-        declared_properties = start_type.find_property(name)
-        if len(declared_properties) > 0:
-            declared_properties = self.type.find_property(name)
-            values_to_assign = []
-            for mc in declared_properties:
-                spec = mc.get_property(name)
-                if caller_class is not None:
-                    if spec.usage not in typespec.PropertyUsages.Writable \
-                            or not derived:
-                        raise exceptions.NoWriteAccessError(name)
-
-                default = self.__config.get(name, spec.default)
-                default = self.__defaults.get(name, default)
-                child_context = yaql.context.Context(
-                    parent_context=self.__context)
-                child_context.set_data(self)
-                default = murano.dsl.helpers.evaluate(
-                    default, child_context, 1)
-
-                obj = self.cast(mc)
-                values_to_assign.append((obj, spec.validate(
-                    value, self, self,
-                    self.__context, self.__object_store, default)))
-            for obj, value in values_to_assign:
-                obj.__properties[name] = value
-        elif derived:
-                obj = self.cast(caller_class)
-                obj.__properties[name] = value
+        declared_properties, derived = self.__type.find_property_writers(
+            name, caller_class)
+        if not declared_properties:
+            self.__properties[caller_class.get_property_key(name)] = value
+            return
+
+        values_to_assign = []
+        for mc in declared_properties:
+            spec = mc.get_property(name)
+            if caller_class is not None:
+                if spec.usage not in typespec.PropertyUsages.Writable \
+                        or not derived:
+                    raise exceptions.NoWriteAccessError(name)
+
+            default = self._get_default(name, spec)
+            values_to_assign.append((mc.get_property_key(name), spec.validate(
+                value, self, self,
+                self.__context, self.__object_store, default)))
+        for key, value in values_to_assign:
+            self.__properties[key] = value
+
+    def _get_default(self, name, spec):
+        config = self.__type.config
+        if name in self.__defaults:
+            default = self.__defaults[name]
+        elif name in config:
+            default = config[name]
+        elif spec.default_needs_evaluation:
+            default = spec.default
         else:
-            raise exceptions.PropertyWriteError(name, start_type)
+            return murano.dsl.helpers.evaluate(spec.default, None, 1)
+        child_context = yaql.context.Context(parent_context=self.__context)
+        child_context.set_data(self)
+        return murano.dsl.helpers.evaluate(default, child_context, 1)
 
     def cast(self, type):
-        if self.type is type:
+        if self.__type is type:
             return self
-        for parent in self.__parents.values():
-            try:
-                return parent.cast(type)
-            except TypeError:
-                continue
+        if type.is_compatible(self.__type):
+            obj = self.__parts.get(type.name)
+            if obj is not None and obj.type is type:
+                return obj
         raise TypeError('Cannot cast')
 
     def __repr__(self):
@@ -187,16 +215,17 @@ class MuranoObject(object):
 
     def to_dictionary(self, include_hidden=False):
         result = {}
-        for parent in self.__parents.values():
-            result.update(parent.to_dictionary(include_hidden))
-        result.update({'?': {'type': self.type.name, 'id': self.object_id}})
         if include_hidden:
-            result.update(self.__properties)
+            for (mc, property_name), value in self.__properties.iteritems():
+                if mc.is_compatible(self.__type):
+                    result[property_name] = value
         else:
-            for property_name in self.type.properties:
-                if property_name in self.__properties:
-                    spec = self.type.get_property(property_name)
-                    if spec.usage != typespec.PropertyUsages.Runtime:
-                        result[property_name] = \
-                            self.__properties[property_name]
+            for mc in reversed(self.__type.mro):
+                for property_name in mc.properties:
+                    key = mc.get_property_key(property_name)
+                    if key in self.__properties:
+                        spec = mc.get_property(property_name)
+                        if spec.usage != typespec.PropertyUsages.Runtime:
+                            result[property_name] = self.__properties[key]
+        result['?'] = {'type': self.type.name, 'id': self.object_id}
         return result
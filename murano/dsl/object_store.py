@@ -24,6 +24,8 @@ class ObjectStore(object):
         self._store = {}
         self._designer_attributes_store = {}
         self._initializing = False
+        self._loaded = []
+        self._loaded_ids = frozenset()
 
     @property
     def initializing(self):
@@ -49,6 +51,8 @@ class ObjectStore(object):
     def load(self, value, owner, context, defaults=None):
         if value is None:
             return None
+        if owner is None and not self._initializing:
+            return self._load_objects([(value, owner)], context, defaults)[0]
         if '?' not in value or 'type' not in value['?']:
             raise ValueError()
         system_key = value['?']
@@ -59,6 +63,8 @@ class ObjectStore(object):
             raise ValueError()
         if object_id in self._store:
             obj = self._store[object_id]
+            if object_id in self._loaded_ids:
+                return obj
         else:
             obj = class_obj.new(owner, self, context=context,
                                 object_id=object_id, defaults=defaults)
@@ -72,24 +78,56 @@ class ObjectStore(object):
         if '_parent' in argspec:
             value['_owner'] = owner
 
+        obj.initialize(**value)
+        if self._initializing:
+            self._loaded.append((obj, value))
+        else:
+            self._invoke_initializers(obj, context)
+        return obj
+
+    def load_detached(self, values, context):
+        """Loads object subtrees that are owned by objects of another store
+
+        All subtrees are loaded together the same way load() loads the
+        root object so that they may reference each other.
+
+        :param values: list of (value, owner) pairs
+        """
+        return self._load_objects(values, context)
+
+    def _load_objects(self, values, context, defaults=None):
+        """Loads object trees in a single pass
+
+        Objects are initialized once, references to objects that are not
+        loaded yet are resolved afterwards and then initialize methods
+        are called for all the loaded objects, innermost first.
+        """
+        self._initializing = True
         try:
-            if owner is None:
-                self._initializing = True
-            obj.initialize(**value)
-            if owner is None:
-                self._initializing = False
-                obj.initialize(**value)
+            objects = [self.load(value, owner, context, defaults)
+                       for value, owner in values]
         finally:
-            if owner is None:
-                self._initializing = False
-
-        if not self.initializing:
-            executor = helpers.get_executor(context)
-            methods = obj.type.find_all_methods('initialize')
-            methods.reverse()
-            for method in methods:
-                method.invoke(executor, obj, {})
-        return obj
+            self._initializing = False
+            loaded, self._loaded = self._loaded, []
+
+        self._loaded_ids = set(obj.object_id for obj, _ in loaded)
+        try:
+            for obj, value in loaded:
+                obj.resolve_references(**value)
+        finally:
+            self._loaded_ids = frozenset()
+
+        for obj, _ in loaded:
+            self._invoke_initializers(obj, context)
+        return objects
+
+    @staticmethod
+    def _invoke_initializers(obj, context):
+        executor = helpers.get_executor(context)
+        methods = obj.type.find_all_methods('initialize')
+        methods.reverse()
+        for method in methods:
+            method.invoke(executor, obj, {})
 
     @staticmethod
     def _get_designer_attributes(header):
@@ -12,45 +12,22 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import inspect
 import os.path
+import sys
 
+from murano.dsl import dsl_exception
 from murano.dsl import helpers
 from murano.dsl import murano_class
 from murano.dsl import murano_object
-from murano.dsl import yaql_expression
 
 
 @murano_class.classname('io.murano.StackTrace')
 class StackTrace(murano_object.MuranoObject):
 
     def initialize(self, _context, includeNativeFrames=True):
-        frames = []
-        context = _context
-        while True:
-            if not context:
-                break
-            frames.append(compose_stack_frame(context))
-            context = helpers.get_caller_context(context)
-        frames.pop()
-        frames.reverse()
-
-        if includeNativeFrames:
-            native_frames = []
-            for frame in inspect.trace()[1:]:
-                location = yaql_expression.YaqlExpressionFilePosition(
-                    os.path.abspath(frame[1]), frame[2],
-                    -1, -1, -1, -1, -1)
-                method = frame[3]
-                native_frames.append({
-                    'instruction': frame[4][0].strip(),
-                    'location': location,
-                    'method': method,
-                    'class': None
-                })
-            frames.extend(native_frames)
-
-        self.set_property('frames', frames)
+        native_traceback = sys.exc_info()[2] if includeNativeFrames else None
+        self.set_property('frames', dsl_exception.compose_frames(
+            dsl_exception.capture_frames(_context), native_traceback))
 
     def toString(self, prefix=''):
         return '\n'.join([format_frame(t, prefix)for t in self.get_property(
@@ -58,17 +35,10 @@ class StackTrace(murano_object.MuranoObject):
 
 
 def compose_stack_frame(context):
-    instruction = helpers.get_current_instruction(context)
-    return {
-        'instruction': None if instruction is None
-        else str(instruction),
-
-        'location': None if instruction is None
-        else instruction.source_file_position,
-
-        'method': helpers.get_current_method(context),
-        'class': helpers.get_type(context)
-    }
+    return dsl_exception.compose_frame(
+        helpers.get_current_instruction(context),
+        helpers.get_current_method(context),
+        helpers.get_type(context))
 
 
 def format_frame(frame, prefix=''):
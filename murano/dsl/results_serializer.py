@@ -25,11 +25,19 @@ class ObjRef(object):
 
 
 def _serialize_tree(root_object, designer_attributes):
+    """Serializes object graph into designer and plain views in one pass
+
+    Both views share the same walk over the object graph and differ only
+    in the system dictionaries: designer view has designer attributes and
+    available actions merged into them while the copy keeps what objects
+    reported themselves.
+    """
     serialized_objects = set()
-    tree = _pass1_serialize(
+    tree, tree_copy = _pass1_serialize(
         root_object, None, serialized_objects, designer_attributes)
     _pass2_serialize(tree, serialized_objects)
-    return tree, serialized_objects
+    _pass2_serialize(tree_copy, serialized_objects)
+    return tree, tree_copy, serialized_objects
 
 
 def serialize(root_object, executor):
@@ -38,9 +46,8 @@ def serialize(root_object, executor):
         tree_copy = None
         attributes = []
     else:
-        tree, serialized_objects = _serialize_tree(
+        tree, tree_copy, serialized_objects = _serialize_tree(
             root_object, executor.object_store.designer_attributes)
-        tree_copy, _ = _serialize_tree(root_object, None)
         attributes = executor.attribute_store.serialize(serialized_objects)
 
     return {
@@ -87,38 +94,44 @@ def _pass1_serialize(value, parent, serialized_objects,
                      designer_attributes_getter):
     if isinstance(value, (types.StringTypes, types.IntType, types.FloatType,
                           types.BooleanType, types.NoneType)):
-        return value
+        return value, value
     elif isinstance(value, murano_object.MuranoObject):
         if not _cmp_objects(value.owner, parent) \
                 or value.object_id in serialized_objects:
-            return ObjRef(value)
+            ref = ObjRef(value)
+            return ref, ref
         else:
-            result = value.to_dictionary()
+            serialized_objects.add(value.object_id)
+            result, result_copy = _pass1_serialize(
+                value.to_dictionary(), value, serialized_objects,
+                designer_attributes_getter)
             if designer_attributes_getter is not None:
-                result['?'].update(designer_attributes_getter(value.object_id))
+                system_key = result['?']
+                system_key.update(designer_attributes_getter(value.object_id))
                 #deserialize and merge list of actions
                 actions = _serialize_available_action(value)
-                result['?']['_actions'] = _merge_actions(
-                    result['?'].get('_actions', {}), actions)
-            serialized_objects.add(value.object_id)
-            return _pass1_serialize(
-                result, value, serialized_objects, designer_attributes_getter)
+                system_key['_actions'] = _merge_actions(
+                    system_key.get('_actions', {}), actions)
+            return result, result_copy
 
     elif isinstance(value, types.DictionaryType):
         result = {}
+        result_copy = {}
         for d_key, d_value in value.iteritems():
             result_key = str(d_key)
-            result[result_key] = _pass1_serialize(
+            result[result_key], result_copy[result_key] = _pass1_serialize(
                 d_value, parent, serialized_objects,
                 designer_attributes_getter)
-        return result
-    elif isinstance(value, types.ListType):
-        return [_pass1_serialize(t, parent, serialized_objects,
-                                 designer_attributes_getter) for t in value]
-    elif isinstance(value, types.TupleType):
-        return _pass1_serialize(
-            list(value), parent, serialized_objects,
-            designer_attributes_getter)
+        return result, result_copy
+    elif isinstance(value, (types.ListType, types.TupleType)):
+        result = []
+        result_copy = []
+        for t in value:
+            item, item_copy = _pass1_serialize(
+                t, parent, serialized_objects, designer_attributes_getter)
+            result.append(item)
+            result_copy.append(item_copy)
+        return result, result_copy
     else:
         raise ValueError()
 
@@ -17,6 +17,8 @@ import types
 import uuid
 
 import yaql.context
+import yaql.exceptions
+import yaql.expressions
 
 from murano.dsl import exceptions
 import murano.dsl.helpers
@@ -27,183 +29,391 @@ import murano.dsl.yaql_expression as yaql_expression
 NoValue = object()
 
 
+class ObjRef(object):
+    def __init__(self, object_id):
+        self.object_id = object_id
+
+
+def _get_default(context):
+    return context.get_data('$?contractDefault')
+
+
+def _check_int(value, context):
+    if value is NoValue:
+        value = _get_default(context)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except Exception:
+        raise exceptions.ContractViolationException(
+            'Value {0} violates int() contract'.format(value))
+
+
+def _check_string(value, context):
+    if value is NoValue:
+        value = _get_default(context)
+    if value is None:
+        return None
+    try:
+        return unicode(value)
+    except Exception:
+        raise exceptions.ContractViolationException(
+            'Value {0} violates string() contract'.format(value))
+
+
+def _check_bool(value, context):
+    if value is NoValue:
+        value = _get_default(context)
+    if value is None:
+        return None
+    return True if value else False
+
+
+def _check_not_null(value, context):
+    if isinstance(value, ObjRef):
+        return value
+
+    if value is None:
+        raise exceptions.ContractViolationException(
+            'null value violates notNull() contract')
+    return value
+
+
+def _check_predicate(value, predicate):
+    if isinstance(value, ObjRef) or predicate(value):
+        return value
+    else:
+        raise exceptions.ContractViolationException(
+            "Value {0} doesn't match predicate".format(value))
+
+
+def _is_object_reference(value):
+    return isinstance(value, (murano.dsl.murano_object.MuranoObject,
+                              ObjRef, types.NoneType))
+
+
+def _is_owned(obj, context):
+    this = context.get_data('$?contractThis')
+    p = obj.owner
+    while p is not None:
+        if p is this:
+            return True
+        p = p.owner
+    return False
+
+
+def _check_owned(obj, context):
+    if isinstance(obj, ObjRef) or obj is None:
+        return obj
+    if _is_owned(obj, context):
+        return obj
+    raise exceptions.ContractViolationException(
+        'Object {0} violates owned() contract'.format(obj.object_id))
+
+
+def _check_not_owned(obj, context):
+    if isinstance(obj, ObjRef) or obj is None:
+        return obj
+    if not _is_owned(obj, context):
+        return obj
+    raise exceptions.ContractViolationException(
+        'Object {0} violates notOwned() contract'.format(obj.object_id))
+
+
+def _check_class(value, context, name, default_name):
+    namespace_resolver = context.get_data('$?contractNamespaceResolver')
+    object_store = context.get_data('$?contractObjectStore')
+    name = namespace_resolver.resolve_name(name)
+    if not default_name:
+        default_name = name
+    else:
+        default_name = namespace_resolver.resolve_name(default_name)
+    class_loader = murano.dsl.helpers.get_class_loader(context)
+    murano_class = class_loader.get_class(name)
+    if not murano_class:
+        raise exceptions.NoClassFound(
+            'Class {0} cannot be found'.format(name))
+    if value is None:
+        return None
+    if isinstance(value, murano.dsl.murano_object.MuranoObject):
+        obj = value
+    elif isinstance(value, types.DictionaryType):
+        if '?' not in value:
+            new_value = {'?': {
+                'id': uuid.uuid4().hex,
+                'type': default_name
+            }}
+            new_value.update(value)
+            value = new_value
+
+        obj = object_store.load(
+            value, context.get_data('$?contractOwner'),
+            context.get_data('$?contractRootContext'),
+            defaults=_get_default(context))
+    elif isinstance(value, types.StringTypes):
+        obj = object_store.get(value)
+        if obj is None:
+            if not object_store.initializing:
+                raise exceptions.NoObjectFoundError(value)
+            else:
+                return ObjRef(value)
+    else:
+        raise exceptions.ContractViolationException(
+            'Value {0} cannot be represented as class {1}'.format(
+                value, name))
+    if not murano_class.is_compatible(obj):
+        raise exceptions.ContractViolationException(
+            'Object of type {0} is not compatible with '
+            'requested type {1}'.format(obj.type.name, name))
+    return obj
+
+
+def _resolve_name(context, prefix, name):
+    namespace_resolver = context.get_data('$?contractNamespaceResolver')
+    return namespace_resolver.resolve_name('%s:%s' % (prefix, name))
+
+
+@yaql.context.ContextAware()
+def _int(context, value):
+    return _check_int(value(), context)
+
+
+@yaql.context.ContextAware()
+def _string(context, value):
+    return _check_string(value(), context)
+
+
+@yaql.context.ContextAware()
+def _bool(context, value):
+    return _check_bool(value(), context)
+
+
+def _not_null(value):
+    return _check_not_null(value(), None)
+
+
+def _error():
+    raise exceptions.ContractViolationException('error() contract')
+
+
+def _check(value, predicate):
+    return _check_predicate(value(), predicate)
+
+
+@yaql.context.EvalArg('obj', custom_validator=_is_object_reference)
+@yaql.context.ContextAware()
+def _owned(context, obj):
+    return _check_owned(obj, context)
+
+
+@yaql.context.EvalArg('obj', custom_validator=_is_object_reference)
+@yaql.context.ContextAware()
+def _not_owned(context, obj):
+    return _check_not_owned(obj, context)
+
+
+@yaql.context.EvalArg('name', arg_type=str)
+@yaql.context.ContextAware()
+def _class(context, value, name):
+    return _check_class(value(), context, name, None)
+
+
+@yaql.context.EvalArg('name', arg_type=str)
+@yaql.context.EvalArg('default_name', arg_type=(str, types.NoneType))
+@yaql.context.ContextAware()
+def _class2(context, value, name, default_name):
+    return _check_class(value(), context, name, default_name)
+
+
+@yaql.context.EvalArg('prefix', str)
+@yaql.context.EvalArg('name', str)
+@yaql.context.ContextAware()
+def _validate(context, prefix, name):
+    return _resolve_name(context, prefix, name)
+
+
+def _create_functions_table():
+    table = yaql.context.Context()
+    table.register_function(_validate, '#validate')
+    table.register_function(_int, 'int')
+    table.register_function(_string, 'string')
+    table.register_function(_bool, 'bool')
+    table.register_function(_check, 'check')
+    table.register_function(_not_null, 'notNull')
+    table.register_function(_error, 'error')
+    table.register_function(_class, 'class')
+    table.register_function(_class2, 'class')
+    table.register_function(_owned, 'owned')
+    table.register_function(_not_owned, 'notOwned')
+    return table
+
+
+class ContractContext(yaql.context.Context):
+    """Context of a single contract validation
+
+    Contract functions are registered once in a table shared by all
+    validations, and take the validated object, its owner and the
+    other validation parameters from the data of this context.
+    """
+
+    functions_table = _create_functions_table()
+
+    def __init__(self, root_context, this, owner, object_store,
+                 namespace_resolver, default):
+        super(ContractContext, self).__init__(parent_context=root_context)
+        self.data['$?contractRootContext'] = root_context
+        self.data['$?contractThis'] = this
+        self.data['$?contractOwner'] = owner
+        self.data['$?contractObjectStore'] = object_store
+        self.data['$?contractNamespaceResolver'] = namespace_resolver
+        self.data['$?contractDefault'] = default
+
+    def get_functions(self, function_name, num_params):
+        result = self.functions_table.get_functions(
+            function_name, num_params)
+        if self.parent_context:
+            result += self.parent_context.get_functions(
+                function_name, num_params)
+        return result
+
+
+class _NotCompilable(Exception):
+    pass
+
+
+def _compile_class_name(node):
+    if isinstance(node, yaql.expressions.Constant) and \
+            isinstance(node.value, str):
+        name = node.value
+        return lambda context: name
+    if type(node) is yaql.expressions.Function and \
+            node.name == '#validate' and node.object is None and \
+            len(node.args) == 2:
+        prefix_node, name_node = node.args
+        if isinstance(prefix_node, yaql.expressions.UnaryOperator) and \
+                prefix_node.name == '#operator_:' and \
+                isinstance(prefix_node.object, yaql.expressions.Constant) \
+                and isinstance(name_node, yaql.expressions.Constant):
+            prefix = prefix_node.object.value
+            name = name_node.value
+            return lambda context: _resolve_name(context, prefix, name)
+    raise _NotCompilable()
+
+
+def _check_object_reference(name, value):
+    if not _is_object_reference(value):
+        raise yaql.exceptions.YaqlExecutionException(
+            'Unable to run ' + name)
+    return value
+
+
+def _compile_step(name, args):
+    if not args:
+        if name == 'int':
+            return _check_int
+        elif name == 'string':
+            return _check_string
+        elif name == 'bool':
+            return _check_bool
+        elif name == 'notNull':
+            return _check_not_null
+        elif name == 'owned':
+            return lambda value, context: _check_owned(
+                _check_object_reference(name, value), context)
+        elif name == 'notOwned':
+            return lambda value, context: _check_not_owned(
+                _check_object_reference(name, value), context)
+    elif name == 'class' and len(args) <= 2:
+        get_name = _compile_class_name(args[0])
+        get_default_name = _compile_class_name(args[1]) \
+            if len(args) == 2 else lambda context: None
+        return lambda value, context: _check_class(
+            value, context, get_name(context), get_default_name(context))
+    elif name == 'check' and len(args) == 1:
+        predicate = args[0]
+        return lambda value, context: _check_predicate(
+            value, predicate.create_callable(
+                yaql.context.Context(parent_context=context)))
+    raise _NotCompilable()
+
+
+def _compile_chain(node):
+    if isinstance(node, yaql.expressions.GetContextValue):
+        path = node.path
+        if isinstance(path, yaql.expressions.Constant) and path.value == '$':
+            return []
+    elif type(node) is yaql.expressions.Function and node.object is not None:
+        steps = _compile_chain(node.object)
+        steps.append((node.name, _compile_step(node.name, node.args)))
+        return steps
+    raise _NotCompilable()
+
+
+class CompiledContract(object):
+    """Native validator for a contract made of a chain of contract calls
+
+    Contracts like $.string().notNull() or $.class(res:Instance) are
+    applied by calling the contract functions directly, without building
+    a YAQL context and resolving every function by name on each call.
+    """
+
+    def __init__(self, steps):
+        self._steps = steps
+        self._names = frozenset(name for name, _ in steps)
+        self._shadowed = {}
+
+    @staticmethod
+    def compile(expression):
+        try:
+            return CompiledContract(_compile_chain(
+                expression.parsed_expression))
+        except _NotCompilable:
+            return None
+
+    def is_shadowed(self, value):
+        # methods of MuranoPL objects take precedence over contract
+        # functions of the same name when evaluated by YAQL
+        if not isinstance(value, murano.dsl.murano_object.MuranoObject):
+            return False
+        murano_class = value.type
+        shadowed = self._shadowed.get(murano_class)
+        if shadowed is None:
+            shadowed = any(murano_class.find_all_methods(name)
+                           for name in self._names)
+            self._shadowed[murano_class] = shadowed
+        return shadowed
+
+    def __call__(self, data, context):
+        for _, step in self._steps:
+            data = step(data, context)
+        return data
+
+
 class TypeScheme(object):
-    class ObjRef(object):
-        def __init__(self, object_id):
-            self.object_id = object_id
+    ObjRef = ObjRef
 
     def __init__(self, spec):
         self._spec = spec
+        self._compiled = {}
+        self._compile(spec)
+
+    def _compile(self, spec):
+        if isinstance(spec, yaql_expression.YaqlExpression):
+            self._compiled[id(spec)] = CompiledContract.compile(spec)
+        elif isinstance(spec, types.DictionaryType):
+            for key, value in spec.iteritems():
+                self._compile(key)
+                self._compile(value)
+        elif isinstance(spec, types.ListType):
+            for item in spec:
+                self._compile(item)
 
     @staticmethod
     def prepare_context(root_context, this, owner, object_store,
                         namespace_resolver, default):
-        def _int(value):
-            value = value()
-            if value is NoValue:
-                value = default
-            if value is None:
-                return None
-            try:
-                return int(value)
-            except Exception:
-                raise exceptions.ContractViolationException(
-                    'Value {0} violates int() contract'.format(value))
-
-        def _string(value):
-            value = value()
-            if value is NoValue:
-                value = default
-            if value is None:
-                return None
-            try:
-                return unicode(value)
-            except Exception:
-                raise exceptions.ContractViolationException(
-                    'Value {0} violates string() contract'.format(value))
-
-        def _bool(value):
-            value = value()
-            if value is NoValue:
-                value = default
-            if value is None:
-                return None
-            return True if value else False
-
-        def _not_null(value):
-            value = value()
-
-            if isinstance(value, TypeScheme.ObjRef):
-                return value
-
-            if value is None:
-                raise exceptions.ContractViolationException(
-                    'null value violates notNull() contract')
-            return value
-
-        def _error():
-            raise exceptions.ContractViolationException('error() contract')
-
-        def _check(value, predicate):
-            value = value()
-            if isinstance(value, TypeScheme.ObjRef) or predicate(value):
-                return value
-            else:
-                raise exceptions.ContractViolationException(
-                    "Value {0} doesn't match predicate".format(value))
-
-        @yaql.context.EvalArg('obj', arg_type=(
-            murano.dsl.murano_object.MuranoObject,
-            TypeScheme.ObjRef,
-            types.NoneType
-        ))
-        def _owned(obj):
-            if isinstance(obj, TypeScheme.ObjRef):
-                return obj
-
-            if obj is None:
-                return None
-
-            p = obj.owner
-            while p is not None:
-                if p is this:
-                    return obj
-                p = p.owner
-
-            raise exceptions.ContractViolationException(
-                'Object {0} violates owned() contract'.format(
-                    obj.object_id))
-
-        @yaql.context.EvalArg('obj', arg_type=(
-            murano.dsl.murano_object.MuranoObject,
-            TypeScheme.ObjRef,
-            types.NoneType
-        ))
-        def _not_owned(obj):
-            if isinstance(obj, TypeScheme.ObjRef):
-                return obj
-
-            if obj is None:
-                return None
-
-            try:
-                _owned(obj)
-            except exceptions.ContractViolationException:
-                return obj
-            else:
-                raise exceptions.ContractViolationException(
-                    'Object {0} violates notOwned() contract'.format(
-                        obj.object_id))
-
-        @yaql.context.EvalArg('name', arg_type=str)
-        def _class(value, name):
-            return _class2(value, name, None)
-
-        @yaql.context.EvalArg('name', arg_type=str)
-        @yaql.context.EvalArg('default_name', arg_type=(str, types.NoneType))
-        def _class2(value, name, default_name):
-            name = namespace_resolver.resolve_name(name)
-            if not default_name:
-                default_name = name
-            else:
-                default_name = namespace_resolver.resolve_name(default_name)
-            value = value()
-            class_loader = murano.dsl.helpers.get_class_loader(root_context)
-            murano_class = class_loader.get_class(name)
-            if not murano_class:
-                raise exceptions.NoClassFound(
-                    'Class {0} cannot be found'.format(name))
-            if value is None:
-                return None
-            if isinstance(value, murano.dsl.murano_object.MuranoObject):
-                obj = value
-            elif isinstance(value, types.DictionaryType):
-                if '?' not in value:
-                    new_value = {'?': {
-                        'id': uuid.uuid4().hex,
-                        'type': default_name
-                    }}
-                    new_value.update(value)
-                    value = new_value
-
-                obj = object_store.load(value, owner, root_context,
-                                        defaults=default)
-            elif isinstance(value, types.StringTypes):
-                obj = object_store.get(value)
-                if obj is None:
-                    if not object_store.initializing:
-                        raise exceptions.NoObjectFoundError(value)
-                    else:
-                        return TypeScheme.ObjRef(value)
-            else:
-                raise exceptions.ContractViolationException(
-                    'Value {0} cannot be represented as class {1}'.format(
-                        value, name))
-            if not murano_class.is_compatible(obj):
-                raise exceptions.ContractViolationException(
-                    'Object of type {0} is not compatible with '
-                    'requested type {1}'.format(obj.type.name, name))
-            return obj
-
-        @yaql.context.EvalArg('prefix', str)
-        @yaql.context.EvalArg('name', str)
-        def _validate(prefix, name):
-            return namespace_resolver.resolve_name(
-                '%s:%s' % (prefix, name))
-
-        context = yaql.context.Context(parent_context=root_context)
-        context.register_function(_validate, '#validate')
-        context.register_function(_int, 'int')
-        context.register_function(_string, 'string')
-        context.register_function(_bool, 'bool')
-        context.register_function(_check, 'check')
-        context.register_function(_not_null, 'notNull')
-        context.register_function(_error, 'error')
-        context.register_function(_class, 'class')
-        context.register_function(_class2, 'class')
-        context.register_function(_owned, 'owned')
-        context.register_function(_not_owned, 'notOwned')
-        return context
+        return ContractContext(root_context, this, owner, object_store,
+                               namespace_resolver, default)
 
     def _map_dict(self, data, spec, context):
         if data is None or data is NoValue:
@@ -275,14 +485,17 @@ class TypeScheme(object):
             return data
 
     def _map(self, data, spec, context):
-        child_context = yaql.context.Context(parent_context=context)
         if isinstance(spec, yaql_expression.YaqlExpression):
+            validator = self._compiled.get(id(spec))
+            if validator is not None and not validator.is_shadowed(data):
+                return validator(data, context)
+            child_context = yaql.context.Context(parent_context=context)
             child_context.set_data(data)
             return spec.evaluate(context=child_context)
         elif isinstance(spec, types.DictionaryType):
-            return self._map_dict(data, spec, child_context)
+            return self._map_dict(data, spec, context)
         elif isinstance(spec, types.ListType):
-            return self._map_list(data, spec, child_context)
+            return self._map_list(data, spec, context)
         elif isinstance(spec, (types.IntType,
                                types.StringTypes,
                                types.NoneType)):
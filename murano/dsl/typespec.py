@@ -13,6 +13,7 @@
 #    under the License.
 
 from murano.dsl import exceptions
+import murano.dsl.helpers
 import murano.dsl.type_scheme as type_scheme
 
 
@@ -34,6 +35,8 @@ class Spec(object):
         self._usage = declaration.get('Usage') or 'In'
         self._default = declaration.get('Default')
         self._has_default = 'Default' in declaration
+        self._default_needs_evaluation = murano.dsl.helpers.needs_evaluation(
+            self._default)
         if self._usage not in PropertyUsages.All:
             raise exceptions.DslSyntaxError(
                 'Unknown type {0}. Must be one of ({1})'.format(
@@ -50,6 +53,10 @@ class Spec(object):
     def default(self):
         return self._default
 
+    @property
+    def default_needs_evaluation(self):
+        return self._default_needs_evaluation
+
     @property
     def has_default(self):
         return self._has_default
@@ -37,8 +37,7 @@ class ThrowMacro(expressions.DslExpression):
             yield murano_class.namespace_resolver.resolve_name(name)
 
     def execute(self, context, murano_class):
-        stacktrace = yaql_functions.new('io.murano.StackTrace', context,
-                                        includeNativeFrames=False)
+        stacktrace = dsl_exception.CapturedStackTrace(context)
         cause = None
         if self._cause:
             cause = helpers.evaluate(self._cause, context).get_property(
@@ -12,7 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import re
+import threading
 import types
 
 import yaql
@@ -20,11 +22,85 @@ import yaql.exceptions
 import yaql.expressions
 
 
+DEFAULT_CACHE_SIZE = 10000
+
+
+class ExpressionCache(object):
+    """Bounded LRU cache of parsed YAQL expressions keyed by source text.
+
+    Parsed expression trees are never modified during evaluation, so a single
+    tree can be safely shared by all the places that use the same text.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self._max_size = max_size
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, value):
+        with self._lock:
+            self._max_size = value
+            self._evict()
+
+    def get(self, expression):
+        with self._lock:
+            parsed_expression = self._cache.pop(expression, None)
+            if parsed_expression is not None:
+                self._cache[expression] = parsed_expression
+                self._hits += 1
+                return parsed_expression
+
+        parsed_expression = yaql.parse(expression)
+        with self._lock:
+            self._misses += 1
+            self._cache[expression] = parsed_expression
+            self._evict()
+        return parsed_expression
+
+    def _evict(self):
+        while len(self._cache) > max(self._max_size, 0):
+            self._cache.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def stats(self):
+        return {
+            'size': len(self._cache),
+            'max_size': self._max_size,
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions
+        }
+
+
+cache = ExpressionCache()
+
+
+def parse(expression):
+    return cache.get(str(expression))
+
+
 class YaqlExpression(object):
     def __init__(self, expression):
         if isinstance(expression, types.StringTypes):
             self._expression = str(expression)
-            self._parsed_expression = yaql.parse(self._expression)
+            self._parsed_expression = parse(self._expression)
             self._file_position = None
         elif isinstance(expression, YaqlExpression):
             self._expression = expression._expression
@@ -41,6 +117,10 @@ class YaqlExpression(object):
     def expression(self):
         return self._expression
 
+    @property
+    def parsed_expression(self):
+        return self._parsed_expression
+
     @property
     def source_file_position(self):
         return self._file_position
@@ -62,7 +142,7 @@ class YaqlExpression(object):
         if re.match('^[\s\w\d.:]*$', expr):
             return False
         try:
-            yaql.parse(expr)
+            parse(expr)
             return True
         except yaql.exceptions.YaqlGrammarException:
             return False
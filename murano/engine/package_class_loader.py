@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import json
 import os.path
 import sys
@@ -31,12 +32,70 @@ CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
+class ClassConfigCache(object):
+    """Class configs shared by all tasks of the engine process.
+
+    Each config file is parsed once and stamped with its modification
+    time. Later lookups only stat the file and parse it again when it
+    was changed, created or removed.
+    """
+
+    def __init__(self):
+        self._configs = {}
+
+    def get(self, directory, name):
+        """Returns (config, read) pair
+
+        read is True when a config file had to be parsed. The config is a
+        copy, so a task changing it does not affect other tasks.
+        """
+        for extension, parse in (('.json', json.load),
+                                 ('.yaml', yaml.safe_load)):
+            path = os.path.join(directory, name + extension)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                self._configs.pop(path, None)
+                continue
+            cached_mtime, config = self._configs.get(path, (None, None))
+            if cached_mtime == mtime:
+                return copy.deepcopy(config), False
+            with open(path) as f:
+                config = parse(f)
+            self._configs[path] = (mtime, config)
+            return copy.deepcopy(config), True
+        return {}, False
+
+    def preload(self, directory):
+        """Parses all config files of the directory in advance"""
+        if not os.path.isdir(directory):
+            return
+        for file_name in os.listdir(directory):
+            name, extension = os.path.splitext(file_name)
+            if extension in ('.json', '.yaml'):
+                self.get(directory, name)
+
+    def invalidate(self):
+        self._configs.clear()
+
+
 class PackageClassLoader(class_loader.MuranoClassLoader):
+    class_configs = ClassConfigCache()
+
     def __init__(self, package_loader):
         self.package_loader = package_loader
         self._class_packages = {}
+        self._config_lookups = 0
+        self._config_reads = 0
         super(PackageClassLoader, self).__init__()
 
+    @property
+    def config_stats(self):
+        return {
+            'lookups': self._config_lookups,
+            'reads': self._config_reads
+        }
+
     def _get_package_for(self, class_name):
         package = self._class_packages.get(class_name, None)
         if package is None:
@@ -46,12 +105,22 @@ class PackageClassLoader(class_loader.MuranoClassLoader):
                     self._class_packages[cn] = package
         return package
 
+    def preload_classes(self, class_names):
+        missing = set(class_names).difference(
+            self._class_packages, self._loaded_types)
+        if not missing:
+            return
+        packages = self.package_loader.get_packages_by_classes(missing)
+        for package in packages.values():
+            for cn in package.classes:
+                self._class_packages[cn] = package
+
     def load_definition(self, name):
         try:
             package = self._get_package_for(name)
             if package is None:
                 raise exceptions.NoPackageForClassFound(name)
-            return package.get_class(name)
+            return self.package_loader.get_class_definition(package, name)
         # (sjmc7) This is used as a control condition for system classes;
         # do not delete (although I think it needs a better solution)
         except exceptions.NoPackageForClassFound:
@@ -75,12 +144,8 @@ class PackageClassLoader(class_loader.MuranoClassLoader):
         return context
 
     def get_class_config(self, name):
-        json_config = os.path.join(CONF.engine.class_configs, name + '.json')
-        if os.path.exists(json_config):
-            with open(json_config) as f:
-                return json.load(f)
-        yaml_config = os.path.join(CONF.engine.class_configs, name + '.yaml')
-        if os.path.exists(yaml_config):
-            with open(yaml_config) as f:
-                return yaml.safe_load(f)
-        return {}
+        config, read = self.class_configs.get(CONF.engine.class_configs, name)
+        self._config_lookups += 1
+        if read:
+            self._config_reads += 1
+        return config
@@ -14,10 +14,16 @@
 # limitations under the License.
 
 import abc
+import collections
+import errno
+import fcntl
+import hashlib
+import itertools
 import os
 import shutil
 import sys
 import tempfile
+import urllib
 import uuid
 
 from muranoclient.common import exceptions as muranoclient_exc
@@ -26,12 +32,16 @@ import six
 from murano.common import config
 from murano.dsl import exceptions
 from murano.engine import yaql_yaml_loader
+from murano.openstack.common import lockutils
 from murano.openstack.common import log as logging
 from murano.packages import exceptions as pkg_exc
 from murano.packages import load_utils
 
 LOG = logging.getLogger(__name__)
 
+PackageReference = collections.namedtuple(
+    'PackageReference', ['id', 'fully_qualified_name', 'updated'])
+
 
 class PackageLoader(six.with_metaclass(abc.ABCMeta)):
     @abc.abstractmethod
@@ -42,20 +52,283 @@ class PackageLoader(six.with_metaclass(abc.ABCMeta)):
     def get_package_by_class(self, name):
         pass
 
+    def get_packages_by_classes(self, names):
+        result = {}
+        for name in names:
+            package = self.get_package_by_class(name)
+            if package is not None:
+                result[name] = package
+        return result
+
+    def get_class_definition(self, package, name):
+        return package.get_class(name)
+
+
+class ClassDefinitionCache(object):
+    """Parsed class definitions shared by all tasks of the engine process.
+
+    Definitions are grouped by package FQN and stamped with the package
+    version reported by the catalog. When the catalog reports another
+    version of the package the whole group is dropped and definitions
+    are parsed again.
+    """
+
+    def __init__(self):
+        self._packages = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get_class(self, package, version, name):
+        cached_version, definitions = self._packages.get(
+            package.full_name, (None, None))
+        if definitions is None or cached_version != version:
+            definitions = {}
+            self._packages[package.full_name] = (version, definitions)
+
+        definition = definitions.get(name)
+        if definition is None:
+            self._misses += 1
+            definition = package.get_class(name)
+            definitions[name] = definition
+        else:
+            self._hits += 1
+        return definition
+
+    def invalidate(self, package_name=None):
+        if package_name is None:
+            self._packages.clear()
+        else:
+            self._packages.pop(package_name, None)
+
+    @property
+    def stats(self):
+        return {
+            'packages': len(self._packages),
+            'hits': self._hits,
+            'misses': self._misses
+        }
+
+
+class PackageCache(object):
+    """Extracted packages shared by all tasks of the engine process.
+
+    Every package version is extracted into its own directory named after
+    the package id and the 'updated' stamp reported by the catalog, so a
+    new version of a package never reuses stale files. Entries are created
+    under an external file lock, which makes the cache safe to share
+    between green threads and between engine processes. A task holds a
+    shared lock on the entries it uses until it releases them, and
+    eviction removes only the least recently used entries it can lock
+    exclusively, so an entry used by a task of any engine process is
+    never removed.
+    """
+
+    lock_prefix = 'murano-package-'
+    usage_suffix = '.usage'
+
+    def __init__(self, directory, size_limit):
+        self._directory = directory
+        self._size_limit = size_limit
+        self._usages = collections.defaultdict(list)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        LOG.debug('Cache for package loader is located at: %s' % directory)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def stats(self):
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions
+        }
+
+    @staticmethod
+    def _get_key(package_id, version):
+        return hashlib.sha1('{0}:{1}'.format(package_id, version)).hexdigest()
+
+    def _lock(self, key):
+        return lockutils.lock(key, self.lock_prefix, external=True,
+                              lock_path=self._directory)
+
+    def _open_usage(self, key):
+        return open(os.path.join(
+            self._directory, key + self.usage_suffix), 'a')
+
+    def acquire(self, package_id, version, download):
+        """Returns directory of the extracted package and marks it as used
+
+        :param download: callable returning package archive contents,
+                         called only when the package is not in the cache
+        """
+        key = self._get_key(package_id, version)
+        path = os.path.join(self._directory, key)
+        with self._lock(key):
+            cached = os.path.isdir(path)
+            if cached:
+                self._hits += 1
+                os.utime(path, None)
+            else:
+                self._misses += 1
+                self._extract(download(), path)
+            usage = self._open_usage(key)
+            fcntl.flock(usage, fcntl.LOCK_SH)
+            self._usages[key].append(usage)
+        if not cached and self._size_limit:
+            self._evict()
+        return path
+
+    def release(self, path):
+        key = os.path.basename(path)
+        usages = self._usages.get(key)
+        if usages:
+            # closing the file drops the shared lock
+            usages.pop().close()
+            if not usages:
+                del self._usages[key]
+
+    def drop(self, path):
+        key = os.path.basename(path)
+        with self._lock(key):
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _extract(self, package_data, path):
+        target_dir = '{0}.{1}'.format(path, uuid.uuid4().hex)
+        package_file = None
+        try:
+            with tempfile.NamedTemporaryFile(delete=False) as package_file:
+                package_file.write(package_data)
+            load_utils.load_from_file(
+                package_file.name, target_dir=target_dir, drop_dir=False,
+                loader=yaql_yaml_loader.YaqlYamlLoader, preload=False)
+            os.rename(target_dir, path)
+        except Exception:
+            shutil.rmtree(target_dir, ignore_errors=True)
+            # another process extracted the package meanwhile
+            if not os.path.isdir(path):
+                raise
+        finally:
+            try:
+                if package_file:
+                    os.remove(package_file.name)
+            except OSError:
+                pass
+
+    def _list_entries(self):
+        for entry in os.listdir(self._directory):
+            path = os.path.join(self._directory, entry)
+            if entry in self._usages or '.' in entry \
+                    or not os.path.isdir(path):
+                continue
+            size = 0
+            for root, dirs, files in os.walk(path):
+                size += sum(os.path.getsize(os.path.join(root, f))
+                            for f in files)
+            yield os.path.getmtime(path), size, entry
+
+    def _evict(self):
+        entries = sorted(self._list_entries())
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total_size <= self._size_limit:
+                break
+            if self._remove_unused(entry):
+                total_size -= size
+                self._evictions += 1
+                LOG.debug('Package {0} was evicted from cache'.format(entry))
+
+    def _remove_unused(self, key):
+        with self._lock(key):
+            with self._open_usage(key) as usage:
+                try:
+                    fcntl.flock(usage, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except IOError as e:
+                    if e.errno in (errno.EACCES, errno.EAGAIN):
+                        # used by a task of some engine process
+                        return False
+                    raise
+                shutil.rmtree(os.path.join(self._directory, key),
+                              ignore_errors=True)
+                os.remove(usage.name)
+            lock_file = os.path.join(self._directory, self.lock_prefix + key)
+        try:
+            os.remove(lock_file)
+        except OSError:
+            pass
+        return True
+
 
 class ApiPackageLoader(PackageLoader):
+    class_definitions = ClassDefinitionCache()
+    package_cache = None
+
     def __init__(self, murano_client_factory):
-        self._cache_directory = self._get_cache_directory()
         self._murano_client_factory = murano_client_factory
+        self._package_versions = {}
+        self._used_directories = []
+        self._cache = self._get_package_cache()
 
     def get_package_by_class(self, name):
-        filter_opts = {'class_name': name, 'limit': 1}
+        package = self.get_packages_by_classes([name]).get(name)
+        if package is None:
+            raise exceptions.NoPackageForClassFound(name)
+        return package
+
+    def get_packages_by_classes(self, names):
+        """Resolves packages for many classes with a single catalog query
+
+        Classes that are not found in the catalog are missing from the
+        result, so callers may fall back to get_package_by_class.
+        """
+        names = set(names)
+        result = {}
+        if not names:
+            return result
         try:
-            package_definition = self._get_definition(filter_opts)
-        except LookupError:
-            exc_info = sys.exc_info()
-            raise exceptions.NoPackageForClassFound(name), None, exc_info[2]
-        return self._get_package_by_definition(package_definition)
+            definitions = list(self._find_classes(names))
+        except muranoclient_exc.HTTPException:
+            LOG.debug('Class lookup is not available, searching packages')
+            try:
+                definitions = list(self._search_classes(names))
+            except muranoclient_exc.HTTPException:
+                LOG.debug('Failed to get package definitions from repository')
+                return result
+
+        packages = {}
+        for class_name, package_definition in definitions:
+            if class_name in result:
+                continue
+            package = packages.get(package_definition.id)
+            if package is None:
+                package = self._get_package_by_definition(package_definition)
+                packages[package_definition.id] = package
+            result[class_name] = package
+        return result
+
+    def _find_classes(self, names):
+        url = '/v1/catalog/classes?' + urllib.urlencode(
+            {'class_name': sorted(names)}, doseq=True)
+        resp, body = self._murano_client_factory().json_request('GET', url)
+        for item in body['classes']:
+            yield item['class_name'], PackageReference(
+                item['package_id'], item['fully_qualified_name'],
+                item['updated'])
+
+    def _search_classes(self, names):
+        filter_opts = {'class_name': sorted(names), 'limit': len(names)}
+        packages = self._murano_client_factory().packages.filter(
+            **filter_opts)
+        # the client requests the next page once the first one is consumed
+        for package_definition in itertools.islice(packages, len(names)):
+            for class_name in names.intersection(
+                    package_definition.class_definitions):
+                yield class_name, package_definition
 
     def get_package(self, name):
         filter_opts = {'fqn': name, 'limit': 1}
@@ -66,18 +339,24 @@ class ApiPackageLoader(PackageLoader):
             raise exceptions.NoPackageFound(name), None, exc_info[2]
         return self._get_package_by_definition(package_definition)
 
-    @staticmethod
-    def _get_cache_directory():
-        base_directory = (
+    def get_class_definition(self, package, name):
+        version = self._package_versions.get(package.full_name)
+        if version is None:
+            return package.get_class(name)
+        return self.class_definitions.get_class(package, version, name)
+
+    @classmethod
+    def _get_package_cache(cls):
+        directory = os.path.abspath(
             config.CONF.packages_opts.packages_cache or
             os.path.join(tempfile.gettempdir(), 'murano-packages-cache')
         )
-        directory = os.path.abspath(os.path.join(base_directory,
-                                                 str(uuid.uuid4())))
-        os.makedirs(directory)
-
-        LOG.debug('Cache for package loader is located at: %s' % directory)
-        return directory
+        if cls.package_cache is None or \
+                cls.package_cache.directory != directory:
+            size_limit = config.CONF.packages_opts.packages_cache_size_limit
+            cls.package_cache = PackageCache(
+                directory, size_limit * 1024 * 1024)
+        return cls.package_cache
 
     def _get_definition(self, filter_opts):
         try:
@@ -95,21 +374,9 @@ class ApiPackageLoader(PackageLoader):
             LOG.debug('Failed to get package definition from repository')
             raise LookupError()
 
-    def _get_package_by_definition(self, package_def):
-        package_id = package_def.id
-        package_name = package_def.fully_qualified_name
-        package_directory = os.path.join(self._cache_directory, package_name)
-
-        if os.path.exists(package_directory):
-            try:
-                return load_utils.load_from_dir(
-                    package_directory, preload=True,
-                    loader=yaql_yaml_loader.YaqlYamlLoader)
-            except pkg_exc.PackageLoadError:
-                LOG.exception('Unable to load package from cache. Clean-up...')
-                shutil.rmtree(package_directory, ignore_errors=True)
+    def _download(self, package_id):
         try:
-            package_data = self._murano_client_factory().packages.download(
+            return self._murano_client_factory().packages.download(
                 package_id)
         except muranoclient_exc.HTTPException as e:
             msg = 'Error loading package id {0}: {1}'.format(
@@ -117,30 +384,37 @@ class ApiPackageLoader(PackageLoader):
             )
             exc_info = sys.exc_info()
             raise pkg_exc.PackageLoadError(msg), None, exc_info[2]
-        package_file = None
-        try:
-            with tempfile.NamedTemporaryFile(delete=False) as package_file:
-                package_file.write(package_data)
 
-            return load_utils.load_from_file(
-                package_file.name,
-                target_dir=package_directory,
-                drop_dir=False,
-                loader=yaql_yaml_loader.YaqlYamlLoader
-            )
-        except IOError:
-            msg = 'Unable to extract package data for %s' % package_id
-            exc_info = sys.exc_info()
-            raise pkg_exc.PackageLoadError(msg), None, exc_info[2]
-        finally:
+    def _get_package_by_definition(self, package_def):
+        package_id = package_def.id
+        package_name = package_def.fully_qualified_name
+        version = getattr(package_def, 'updated', None)
+        self._package_versions[package_name] = version
+
+        for attempt in xrange(2):
             try:
-                if package_file:
-                    os.remove(package_file.name)
-            except OSError:
-                pass
+                package_directory = self._cache.acquire(
+                    package_id, version, lambda: self._download(package_id))
+            except IOError:
+                msg = 'Unable to extract package data for %s' % package_id
+                exc_info = sys.exc_info()
+                raise pkg_exc.PackageLoadError(msg), None, exc_info[2]
+            self._used_directories.append(package_directory)
+
+            try:
+                return load_utils.load_from_dir(
+                    package_directory, preload=False,
+                    loader=yaql_yaml_loader.YaqlYamlLoader)
+            except pkg_exc.PackageLoadError:
+                if attempt:
+                    raise
+                LOG.exception('Unable to load package from cache. Clean-up...')
+                self._cache.drop(package_directory)
 
     def cleanup(self):
-        shutil.rmtree(self._cache_directory, ignore_errors=True)
+        for package_directory in self._used_directories:
+            self._cache.release(package_directory)
+        self._used_directories = []
 
     def __enter__(self):
         return self
@@ -13,6 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+
+import eventlet
 from oslo import messaging
 
 from murano.common import config
@@ -24,18 +27,82 @@ from murano.openstack.common import log as logging
 LOG = logging.getLogger(__name__)
 
 
+class _ReportBuffer(object):
+    """Collects status reports of tasks and sends them in batches
+
+    Reports of each environment are sent as a single notification after
+    [engine] report_flush_interval milliseconds, once report_batch_size
+    of them are collected or when the task of the environment ends.
+    Errors and warnings are also counted, so that the result of the task
+    does not depend on when the API stores the reports.
+    """
+
+    def __init__(self):
+        self._reports = collections.defaultdict(list)
+        self._problems = collections.defaultdict(collections.Counter)
+        self._timers = {}
+        self._notifier = None
+
+    def add(self, environment_id, report):
+        if report['level'] in ('error', 'warning'):
+            self._problems[environment_id][report['level']] += 1
+        reports = self._reports[environment_id]
+        reports.append(report)
+        if len(reports) >= config.CONF.engine.report_batch_size:
+            self.flush(environment_id)
+        elif environment_id not in self._timers:
+            self._timers[environment_id] = eventlet.spawn_after(
+                config.CONF.engine.report_flush_interval / 1000.0,
+                self.flush, environment_id)
+
+    def flush(self, environment_id):
+        timer = self._timers.pop(environment_id, None)
+        if timer is not None:
+            timer.cancel()
+        reports = self._reports.pop(environment_id, None)
+        if not reports:
+            return
+        try:
+            self._get_notifier().info({}, 'murano.report_notifications',
+                                      {'reports': reports})
+        except Exception:
+            LOG.exception('Unable to send {0} status reports of environment '
+                          '{1}'.format(len(reports), environment_id))
+
+    def pop_problems(self, environment_id):
+        counts = self._problems.pop(environment_id, {})
+        return counts.get('error', 0), counts.get('warning', 0)
+
+    def _get_notifier(self):
+        if self._notifier is None:
+            if StatusReporter.transport is None:
+                StatusReporter.transport = \
+                    messaging.get_transport(config.CONF)
+            self._notifier = messaging.Notifier(
+                StatusReporter.transport,
+                publisher_id=uuidutils.generate_uuid(),
+                topic='murano')
+        return self._notifier
+
+
+REPORTS = _ReportBuffer()
+
+
+def flush(environment_id):
+    """Sends status reports of the environment collected so far"""
+    REPORTS.flush(environment_id)
+
+
+def pop_problems(environment_id):
+    """Returns and resets numbers of errors and warnings of the environment"""
+    return REPORTS.pop_problems(environment_id)
+
+
 @murano_class.classname('io.murano.system.StatusReporter')
 class StatusReporter(object):
     transport = None
 
     def initialize(self, environment):
-        if StatusReporter.transport is None:
-            StatusReporter.transport = \
-                messaging.get_transport(config.CONF)
-        self._notifier = messaging.Notifier(
-            StatusReporter.transport,
-            publisher_id=uuidutils.generate_uuid(),
-            topic='murano')
         self._environment_id = environment.object_id
 
     def _report(self, instance, msg, details=None, level='info'):
@@ -46,7 +113,7 @@ class StatusReporter(object):
             'level': level,
             'environment_id': self._environment_id
         }
-        self._notifier.info({}, 'murano.report_notification', body)
+        REPORTS.add(self._environment_id, body)
 
     def report(self, instance, msg):
         self._report(instance, msg)
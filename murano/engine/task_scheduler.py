@@ -0,0 +1,129 @@
+# Copyright (c) 2015 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import time
+
+import eventlet
+
+from murano.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+_Entry = collections.namedtuple(
+    '_Entry', ['tenant_id', 'environment_id', 'task', 'queued_at'])
+
+
+class TenantStats(object):
+    def __init__(self):
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+
+    def to_dict(self):
+        completed = self.completed or 1
+        return {
+            'queued': self.queued,
+            'running': self.running,
+            'completed': self.completed,
+            'average_wait_time': self.wait_time / completed,
+            'average_run_time': self.run_time / completed
+        }
+
+
+class TaskScheduler(object):
+    """Runs engine tasks with bounded concurrency
+
+    Tasks of the same environment run one at a time in the order they
+    were submitted. When a slot frees up, tenants that have tasks ready
+    to run take turns, so a tenant with many queued tasks cannot starve
+    the others.
+    """
+
+    def __init__(self, handler, max_concurrent_tasks):
+        if max_concurrent_tasks < 1:
+            raise ValueError('At least one task has to be allowed to run')
+        self._handler = handler
+        self._max_concurrent_tasks = max_concurrent_tasks
+        self._running = 0
+        # the size is not used, concurrency is limited by the scheduler
+        # itself so that a finishing task can start the next one
+        self._pool = eventlet.GreenPool()
+        self._queues = collections.OrderedDict()
+        self._busy_environments = set()
+        self._stats = collections.defaultdict(TenantStats)
+
+    def submit(self, tenant_id, environment_id, task):
+        self._queues.setdefault(tenant_id, collections.deque()).append(
+            _Entry(tenant_id, environment_id, task, time.time()))
+        self._stats[tenant_id].queued += 1
+        self._dispatch()
+
+    @property
+    def stats(self):
+        return dict((tenant_id, stats.to_dict())
+                    for tenant_id, stats in self._stats.iteritems())
+
+    @property
+    def queued(self):
+        return sum(len(queue) for queue in self._queues.itervalues())
+
+    def wait(self):
+        """Waits until all submitted tasks are processed"""
+        while self._running:
+            self._pool.waitall()
+
+    def _dispatch(self):
+        while self._running < self._max_concurrent_tasks:
+            entry = self._take_next()
+            if entry is None:
+                return
+            self._running += 1
+            self._busy_environments.add(entry.environment_id)
+            stats = self._stats[entry.tenant_id]
+            stats.queued -= 1
+            stats.running += 1
+            self._pool.spawn_n(self._run, entry)
+
+    def _take_next(self):
+        for tenant_id, queue in self._queues.items():
+            for entry in queue:
+                if entry.environment_id not in self._busy_environments:
+                    queue.remove(entry)
+                    # the tenant goes to the end of the line
+                    del self._queues[tenant_id]
+                    if queue:
+                        self._queues[tenant_id] = queue
+                    return entry
+        return None
+
+    def _run(self, entry):
+        started_at = time.time()
+        try:
+            self._handler(entry.task)
+        except Exception:
+            LOG.exception('Unhandled error in task of environment %s',
+                          entry.environment_id)
+        finally:
+            stats = self._stats[entry.tenant_id]
+            stats.running -= 1
+            stats.completed += 1
+            stats.wait_time += started_at - entry.queued_at
+            stats.run_time += time.time() - started_at
+            self._running -= 1
+            self._busy_environments.discard(entry.environment_id)
+            self._dispatch()
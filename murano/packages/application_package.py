@@ -29,9 +29,10 @@ class PackageTypes(object):
 
 
 class ApplicationPackage(object):
-    def __init__(self, source_directory, manifest, loader):
+    def __init__(self, source_directory, manifest, loader, archive=None):
         self.yaml_loader = loader
         self._source_directory = source_directory
+        self._archive = archive
         self._full_name = None
         self._package_type = None
         self._display_name = None
@@ -88,31 +89,65 @@ class ApplicationPackage(object):
     @property
     def blob(self):
         if not self._blob_cache:
-            self._blob_cache = _pack_dir(self._source_directory)
+            if self._archive is not None:
+                with open(self._archive.filename, 'rb') as stream:
+                    self._blob_cache = stream.read()
+            else:
+                self._blob_cache = _pack_dir(self._source_directory)
         return self._blob_cache
 
     def get_resource(self, name):
+        if self._archive is not None:
+            raise e.PackageLoadError(
+                'Resources are not available for packages loaded '
+                'without extraction')
         resources_dir = os.path.join(self._source_directory, 'Resources')
         if not os.path.exists(resources_dir):
             os.makedirs(resources_dir)
         return os.path.join(resources_dir, name)
 
+    def close(self):
+        """Closes the archive the package is read from, if any"""
+        if self._archive is not None:
+            self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
     def validate(self):
         self._load_logo(True)
         self._load_supplier_logo(True)
 
+    def _file_exists(self, *path):
+        if self._archive is not None:
+            try:
+                self._archive.getinfo('/'.join(path))
+                return True
+            except KeyError:
+                return False
+        return os.path.isfile(os.path.join(self._source_directory, *path))
+
+    def _read_file(self, *path):
+        if self._archive is not None:
+            return self._archive.read('/'.join(path))
+        with open(os.path.join(self._source_directory, *path)) as stream:
+            return stream.read()
+
     def _load_logo(self, validate=False):
         logo_file = self._logo or 'logo.png'
-        full_path = os.path.join(self._source_directory, logo_file)
-        if not os.path.isfile(full_path) and logo_file == 'logo.png':
+        if not self._file_exists(logo_file) and logo_file == 'logo.png':
             self._logo_cache = None
             return
         try:
+            logo = self._read_file(logo_file)
             if validate:
-                if imghdr.what(full_path) != 'png':
+                if imghdr.what(None, logo) != 'png':
                     raise e.PackageLoadError("Logo is not in PNG format")
-            with open(full_path) as stream:
-                self._logo_cache = stream.read()
+            self._logo_cache = logo
         except Exception as ex:
             trace = sys.exc_info()[2]
             raise e.PackageLoadError(
@@ -122,17 +157,17 @@ class ApplicationPackage(object):
         if 'Logo' not in self._supplier:
             self._supplier['Logo'] = None
         logo_file = self._supplier['Logo'] or 'supplier_logo.png'
-        full_path = os.path.join(self._source_directory, logo_file)
-        if not os.path.isfile(full_path) and logo_file == 'supplier_logo.png':
+        if not self._file_exists(logo_file) and \
+                logo_file == 'supplier_logo.png':
             del self._supplier['Logo']
             return
         try:
+            logo = self._read_file(logo_file)
             if validate:
-                if imghdr.what(full_path) != 'png':
+                if imghdr.what(None, logo) != 'png':
                     raise e.PackageLoadError(
                         "Supplier Logo is not in PNG format")
-            with open(full_path) as stream:
-                self._supplier_logo_cache = stream.read()
+            self._supplier_logo_cache = logo
         except Exception as ex:
             trace = sys.exc_info()[2]
             raise e.PackageLoadError(
@@ -37,8 +37,9 @@ Dumper.add_representer(YAQL, yaql_representer)
 
 
 class HotPackage(murano.packages.application_package.ApplicationPackage):
-    def __init__(self, source_directory, manifest, loader):
-        super(HotPackage, self).__init__(source_directory, manifest, loader)
+    def __init__(self, source_directory, manifest, loader, archive=None):
+        super(HotPackage, self).__init__(
+            source_directory, manifest, loader, archive)
         self._translated_class = None
         self._source_directory = source_directory
         self._translated_ui = None
@@ -67,23 +68,30 @@ class HotPackage(murano.packages.application_package.ApplicationPackage):
             self._translate_class()
         return self._translated_class
 
+    def get_resource(self, name):
+        path = super(HotPackage, self).get_resource(name)
+        if name == self.full_name and not os.path.exists(path):
+            template_file = os.path.join(self._source_directory,
+                                         'template.yaml')
+            shutil.copy(template_file, path)
+        return path
+
     def validate(self):
         self.get_class(self.full_name)
         if not self._translated_ui:
             self._translated_ui = self._translate_ui()
         super(HotPackage, self).validate()
 
-    def _translate_class(self):
-        template_file = os.path.join(self._source_directory, 'template.yaml')
-        shutil.copy(template_file, self.get_resource(self.full_name))
-
-        if not os.path.isfile(template_file):
+    def _load_template(self):
+        if not self._file_exists('template.yaml'):
             raise exceptions.PackageClassLoadError(
                 self.full_name, 'File with class definition not found')
-        with open(template_file) as stream:
-            hot = yaml.safe_load(stream)
-            if 'resources' not in hot:
-                raise exceptions.PackageFormatError('Not a HOT template')
+        return yaml.safe_load(self._read_file('template.yaml'))
+
+    def _translate_class(self):
+        hot = self._load_template()
+        if 'resources' not in hot:
+            raise exceptions.PackageFormatError('Not a HOT template')
         translated = {
             'Name': self.full_name,
             'Extends': 'io.murano.Application'
@@ -382,13 +390,7 @@ class HotPackage(murano.packages.application_package.ApplicationPackage):
         return app
 
     def _translate_ui(self):
-        template_file = os.path.join(self._source_directory, 'template.yaml')
-
-        if not os.path.isfile(template_file):
-            raise exceptions.PackageClassLoadError(
-                self.full_name, 'File with class definition not found')
-        with open(template_file) as stream:
-            hot = yaml.safe_load(stream)
+        hot = self._load_template()
 
         translated = {
             'Version': 2,
@@ -12,6 +12,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import os
 import shutil
 import sys
@@ -27,7 +28,7 @@ import murano.packages.versions.mpl_v1
 
 
 def load_from_file(archive_path, target_dir=None, drop_dir=False,
-                   loader=yaql_yaml_loader.YaqlYamlLoader):
+                   loader=yaql_yaml_loader.YaqlYamlLoader, preload=True):
     if not os.path.isfile(archive_path):
         raise e.PackageLoadError('Unable to find package file')
     created = False
@@ -45,9 +46,9 @@ def load_from_file(archive_path, target_dir=None, drop_dir=False,
         if not zipfile.is_zipfile(archive_path):
             raise e.PackageFormatError("Uploading file should be a "
                                        "zip' archive")
-        package = zipfile.ZipFile(archive_path)
-        package.extractall(path=target_dir)
-        return load_from_dir(target_dir, preload=True, loader=loader)
+        with contextlib.closing(zipfile.ZipFile(archive_path)) as package:
+            package.extractall(path=target_dir)
+        return load_from_dir(target_dir, preload=preload, loader=loader)
     finally:
         if drop_dir:
             if created:
@@ -57,14 +58,32 @@ def load_from_file(archive_path, target_dir=None, drop_dir=False,
                     os.unlink(os.path.join(target_dir, f))
 
 
-def load_from_dir(source_directory, filename='manifest.yaml', preload=False,
+def load_from_zip(archive_path, filename='manifest.yaml', preload=True,
                   loader=yaql_yaml_loader.YaqlYamlLoader):
-    formats = {
-        '1.0': murano.packages.versions.mpl_v1,
-        'MuranoPL/1.0': murano.packages.versions.mpl_v1,
-        'Heat.HOT/1.0': murano.packages.versions.hot_v1
-    }
+    """Load package straight from the zip archive without extracting it.
+       Files are read from the archive only when the package needs them,
+       so the package can be validated at the cost of the bytes it reads.
+       The archive stays open until the package is closed.
+    """
+    if not os.path.isfile(archive_path):
+        raise e.PackageLoadError('Unable to find package file')
+    if not zipfile.is_zipfile(archive_path):
+        raise e.PackageFormatError("Uploading file should be a "
+                                   "zip' archive")
+    archive = zipfile.ZipFile(archive_path)
+    try:
+        try:
+            manifest = archive.read(filename)
+        except KeyError:
+            raise e.PackageLoadError('Unable to find package manifest')
+        return _load(None, archive, manifest, preload, loader)
+    except Exception:
+        archive.close()
+        raise
+
 
+def load_from_dir(source_directory, filename='manifest.yaml', preload=False,
+                  loader=yaql_yaml_loader.YaqlYamlLoader):
     if not os.path.isdir(source_directory) or not os.path.exists(
             source_directory):
         raise e.PackageLoadError('Invalid package directory')
@@ -72,9 +91,20 @@ def load_from_dir(source_directory, filename='manifest.yaml', preload=False,
     if not os.path.isfile(full_path):
         raise e.PackageLoadError('Unable to find package manifest')
 
+    with open(full_path) as stream:
+        manifest = stream.read()
+    return _load(source_directory, None, manifest, preload, loader)
+
+
+def _load(source_directory, archive, manifest, preload, loader):
+    formats = {
+        '1.0': murano.packages.versions.mpl_v1,
+        'MuranoPL/1.0': murano.packages.versions.mpl_v1,
+        'Heat.HOT/1.0': murano.packages.versions.hot_v1
+    }
+
     try:
-        with open(full_path) as stream:
-            content = yaml.safe_load(stream)
+        content = yaml.safe_load(manifest)
     except Exception as ex:
         trace = sys.exc_info()[2]
         raise e.PackageLoadError(
@@ -84,7 +114,8 @@ def load_from_dir(source_directory, filename='manifest.yaml', preload=False,
         if not p_format or p_format not in formats:
             raise e.PackageFormatError(
                 'Unknown or missing format version')
-        package = formats[p_format].create(source_directory, content, loader)
+        package = formats[p_format].create(
+            source_directory, content, loader, archive)
         formats[p_format].load(package, content)
         if preload:
             package.validate()
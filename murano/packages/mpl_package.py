@@ -12,7 +12,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import os
 import sys
 import yaml
 
@@ -21,9 +20,9 @@ from murano.packages import exceptions
 
 
 class MuranoPlPackage(murano.packages.application_package.ApplicationPackage):
-    def __init__(self, source_directory, manifest, loader):
+    def __init__(self, source_directory, manifest, loader, archive=None):
         super(MuranoPlPackage, self).__init__(
-            source_directory, manifest, loader)
+            source_directory, manifest, loader, archive)
 
         self._classes = None
         self._ui = None
@@ -58,17 +57,15 @@ class MuranoPlPackage(murano.packages.application_package.ApplicationPackage):
             self._ui_cache = yaml.load(self._raw_ui_cache, self.yaml_loader)
         else:
             ui_file = self._ui
-            full_path = os.path.join(self._source_directory, 'UI', ui_file)
-            if not os.path.isfile(full_path):
+            if not self._file_exists('UI', ui_file):
                 self._raw_ui_cache = None
                 self._ui_cache = None
                 return
             try:
-                with open(full_path) as stream:
-                    self._raw_ui_cache = stream.read()
-                    if load_yaml:
-                        self._ui_cache = yaml.load(self._raw_ui_cache,
-                                                   self.yaml_loader)
+                self._raw_ui_cache = self._read_file('UI', ui_file)
+                if load_yaml:
+                    self._ui_cache = yaml.load(self._raw_ui_cache,
+                                               self.yaml_loader)
             except Exception as ex:
                 trace = sys.exc_info()[2]
                 raise exceptions.PackageUILoadError(str(ex)), None, trace
@@ -78,13 +75,12 @@ class MuranoPlPackage(murano.packages.application_package.ApplicationPackage):
             raise exceptions.PackageClassLoadError(
                 name, 'Class not defined in this package')
         def_file = self._classes[name]
-        full_path = os.path.join(self._source_directory, 'Classes', def_file)
-        if not os.path.isfile(full_path):
+        if not self._file_exists('Classes', def_file):
             raise exceptions.PackageClassLoadError(
                 name, 'File with class definition not found')
         try:
-            with open(full_path) as stream:
-                self._classes_cache[name] = yaml.load(stream, self.yaml_loader)
+            self._classes_cache[name] = yaml.load(
+                self._read_file('Classes', def_file), self.yaml_loader)
         except Exception as ex:
             trace = sys.exc_info()[2]
             msg = 'Unable to load class definition due to "{0}"'.format(
@@ -41,9 +41,9 @@ def load(package, yaml_content):
     package._tags = yaml_content.get('Tags')
 
 
-def create(source_directory, content, loader):
+def create(source_directory, content, loader, archive=None):
     return murano.packages.hot_package.HotPackage(
-        source_directory, content, loader)
+        source_directory, content, loader, archive)
 
 
 def _check_full_name(full_name):
@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+
 from murano.common import rpc
 from murano.db import models
 from murano.db.services import actions as actions_db
@@ -29,7 +31,8 @@ class ActionServices(object):
             }
         task = {
             'action': action,
-            'model': session.description,
+            # the model is changed below, the session keeps its description
+            'model': copy.deepcopy(session.description),
             'token': token,
             'tenant_id': environment.tenant_id,
             'id': environment.id
@@ -53,7 +56,8 @@ class ActionServices(object):
         status.level = 'info'
         task_info.statuses.append(status)
         with unit.begin():
-            unit.add(session)
+            # session was created by another unit which may still be alive
+            unit.merge(session)
             unit.add(task_info)
 
     @staticmethod
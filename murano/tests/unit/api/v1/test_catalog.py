@@ -82,6 +82,129 @@ class TestCatalogApi(test_base.ControllerTest, test_base.MuranoApiTestCase):
 
         self.assertEqual(imghdr.what('', result), 'png')
 
+    def test_find_classes(self):
+        self._set_policy_rules(
+            {'search_packages': '@'}
+        )
+        package_from_dir, package = self._test_package()
+        saved_package = db_catalog_api.package_upload(package, '')
+
+        self.expect_policy_check('search_packages')
+        class_name = package_from_dir.classes[0]
+        req = self._get('/v1/catalog/classes',
+                        params={'class_name': class_name})
+        result = self.controller.find_classes(req)
+
+        self.assertEqual(1, len(result['classes']))
+        self.assertEqual({'class_name': class_name,
+                          'package_id': saved_package.id,
+                          'fully_qualified_name': package_from_dir.full_name,
+                          'updated': saved_package.updated},
+                         result['classes'][0])
+
+    def test_download_package(self):
+        self._set_policy_rules(
+            {'download_package': '@'}
+        )
+        package_from_dir, package = self._test_package()
+        saved_package = db_catalog_api.package_upload(package, '')
+        path = '/catalog/packages/%s/download' % saved_package.id
+
+        for i in xrange(4):
+            self.expect_policy_check('download_package',
+                                     {'package_id': saved_package.id})
+
+        res = self._get(path).get_response(self.api)
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(package['archive'], res.body)
+        self.assertEqual('application/octet-stream', res.content_type)
+
+        req = self._get(path)
+        req.if_none_match = res.etag
+        self.assertEqual(304, req.get_response(self.api).status_code)
+
+        with mock.patch.object(db_catalog_api, 'package_blob_get') as get:
+            req = self._get(path)
+            req.if_none_match = res.etag
+            self.assertEqual(304, req.get_response(self.api).status_code)
+            self.assertFalse(get.called)
+
+        req = self._get(path)
+        req.range = (0, 10)
+        res = req.get_response(self.api)
+        self.assertEqual(206, res.status_code)
+        self.assertEqual(package['archive'][:10], res.body)
+
+    def test_upload_package_too_large(self):
+        self.override_config('package_size_limit', 0, 'packages_opts')
+        self._set_policy_rules({'upload_package': '@'})
+        self.expect_policy_check('upload_package')
+
+        body = '''\
+
+--BOUNDARY
+Content-Disposition: form-data; name="ziparchive"; filename="test.zip"
+Content-Type: application/zip
+
+This is a fake zip archive
+--BOUNDARY--'''
+        content_type = 'multipart/form-data; ; boundary=BOUNDARY'
+        req = self._post('/catalog/packages', body, content_type=content_type)
+        res = req.get_response(self.api)
+
+        self.assertEqual(400, res.status_code)
+        self.assertIn('Uploading file is too large', res.body)
+
+    def test_upload_package_at_size_limit(self):
+        # multipart boundaries and metadata don't count toward the limit
+        self.override_config('package_size_limit', 1, 'packages_opts')
+        self._set_policy_rules({'upload_package': '@'})
+        self.expect_policy_check('upload_package')
+        package_from_dir, package_metadata = self._test_package()
+
+        body = '''\
+
+--BOUNDARY
+Content-Disposition: form-data; name="ziparchive"; filename="test.zip"
+Content-Type: application/zip
+
+%s
+--BOUNDARY
+Content-Disposition: form-data; name="metadata"; filename="test.json"
+Content-Type: application/json
+
+%s
+--BOUNDARY--''' % ('x' * 1024 * 1024, package_metadata)
+
+        with mock.patch('murano.packages.load_utils.load_from_zip') as lff:
+            lff.return_value = package_from_dir
+            req = self._post(
+                '/catalog/packages', body,
+                content_type='multipart/form-data; ; boundary=BOUNDARY')
+            res = req.get_response(self.api)
+
+        self.assertEqual(200, res.status_code)
+
+    def test_upload_package_too_large_unauthorized(self):
+        self.override_config('package_size_limit', 0, 'packages_opts')
+        self._set_policy_rules({'upload_package': '!'})
+        self.expect_policy_check('upload_package')
+
+        body = '''\
+
+--BOUNDARY
+Content-Disposition: form-data; name="ziparchive"; filename="test.zip"
+Content-Type: application/zip
+
+This is a fake zip archive
+--BOUNDARY--'''
+        req = self._post(
+            '/catalog/packages', body,
+            content_type='multipart/form-data; ; boundary=BOUNDARY')
+        res = req.get_response(self.api)
+
+        self.assertEqual(403, res.status_code)
+
     def test_add_public_unauthorized(self):
         policy.set_rules({
             'upload_package': '@',
@@ -112,7 +235,7 @@ Content-Type: application/json
 %s
 --BOUNDARY--''' % package_metadata
 
-        with mock.patch('murano.packages.load_utils.load_from_file') as lff:
+        with mock.patch('murano.packages.load_utils.load_from_zip') as lff:
             lff.return_value = package_from_dir
             req = self._post(
                 '/catalog/packages',
@@ -129,6 +129,17 @@ class MuranoMigrationsCheckers(object):
         self.assertColumnExists(engine, 'task', 'action')
         self.assertColumnExists(engine, 'status', 'task_id')
 
+    def _check_005(self, engine, data):
+        self.assertEqual('005', migration.version(engine))
+        self.assertIndexMembers(engine, 'class_definition',
+                                'ix_class_definition_name_package',
+                                ['name', 'package_id'])
+
+    def _check_006(self, engine, data):
+        self.assertEqual('006', migration.version(engine))
+        self.assertColumnsExists(engine, 'object_model_entry',
+                                 ['owner_id', 'key', 'data'])
+
 
 class TestMigrationsMySQL(MuranoMigrationsCheckers,
                           base.BaseWalkMigrationTestCase,
@@ -87,3 +87,46 @@ class CatalogDBTestCase(base.MuranoWithDBTestCase):
 
         self.assertRaises(exc.HTTPNotFound,
                           api.package_get, package.id, self.context)
+
+    def test_package_search_by_class_names(self):
+        for i in xrange(3):
+            values = self._stub_package()
+            values['fully_qualified_name'] = 'com.example.package{0}'.format(i)
+            values['class_definitions'] = ['com.example.Class{0}'.format(i)]
+            api.package_upload(values, self.tenant_id)
+
+        packages = api.package_search(
+            {'class_name': ['com.example.Class0', 'com.example.Class2']},
+            self.context)
+
+        self.assertEqual(['com.example.package0', 'com.example.package2'],
+                         sorted(p.fully_qualified_name for p in packages))
+
+    def test_class_packages_get(self):
+        for i, is_public in enumerate((True, False)):
+            values = self._stub_package()
+            values['fully_qualified_name'] = 'com.example.package{0}'.format(i)
+            values['class_definitions'] = ['com.example.Class']
+            values['is_public'] = is_public
+            api.package_upload(values, 'other_tenant')
+
+        rows = api.class_packages_get(['com.example.Class'], self.context)
+
+        self.assertEqual(1, len(rows))
+        class_name, package_id, fqn, updated = rows[0]
+        self.assertEqual('com.example.Class', class_name)
+        self.assertEqual('com.example.package0', fqn)
+
+    def test_package_blobs_are_deferred(self):
+        values = self._stub_package()
+        values['is_public'] = True
+        package = api.package_upload(values, self.tenant_id)
+
+        found = api.package_search({}, self.context)
+        self.assertEqual(1, len(found))
+        for column in ('archive', 'logo', 'supplier_logo', 'ui_definition'):
+            self.assertNotIn(column, found[0].__dict__)
+
+        self.assertEqual('archive blob here',
+                         api.package_blob_get(package.id, self.context,
+                                              'archive'))
@@ -13,7 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import mock
+
 from murano.db import models
+from murano.db import object_model
 from murano.db import session
 from murano.tests.unit import base
 
@@ -30,3 +33,91 @@ class TestModels(base.MuranoWithDBTestCase):
                     "'Application', NULL)")
         loaded_e = session.get_session().query(models.Package).get(1)
         self.assertEqual(None, loaded_e.supplier)
+
+    def _description(self, *service_names):
+        return {
+            'Objects': {
+                '?': {'id': 'env', 'type': 'io.murano.Environment'},
+                'services': [{'?': {'id': name, 'type': 'App'},
+                              'name': name} for name in service_names]
+            },
+            'Attributes': [['env', 'key', 'value']]
+        }
+
+    def _save_environment(self, description):
+        unit = session.get_session()
+        environment = models.Environment(name='env', tenant_id='tenant')
+        environment.description = description
+        environment.save(unit)
+        return environment.id
+
+    def test_description_is_stored_by_objects(self):
+        description = self._description('app1', 'app2')
+        environment_id = self._save_environment(description)
+
+        unit = session.get_session()
+        environment = unit.query(models.Environment).get(environment_id)
+        self.assertEqual(description, environment.description)
+        self.assertEqual(['Objects/app1', 'Objects/app2', 'Objects/env'],
+                         sorted(environment.object_model_entries))
+
+    def test_only_changed_objects_are_written(self):
+        environment_id = self._save_environment(
+            self._description('app1', 'app2'))
+
+        unit = session.get_session()
+        environment = unit.query(models.Environment).get(environment_id)
+        description = environment.description
+        description['Objects']['services'][0]['name'] = 'changed'
+        environment.description = description
+
+        dirty = [entry.key
+                 for entry in environment.object_model_entries.values()
+                 if entry in unit.dirty]
+        self.assertEqual(['Objects/app1'], dirty)
+
+    def test_removed_objects_are_deleted(self):
+        environment_id = self._save_environment(
+            self._description('app1', 'app2'))
+
+        unit = session.get_session()
+        environment = unit.query(models.Environment).get(environment_id)
+        environment.description = self._description('app2')
+        environment.save(unit)
+
+        self.assertEqual(2, unit.query(models.ObjectModelEntry).count())
+        self.assertEqual(self._description('app2'),
+                         environment.description)
+
+    def test_description_is_assembled_once(self):
+        environment_id = self._save_environment(self._description('app1'))
+
+        unit = session.get_session()
+        environment = unit.query(models.Environment).get(environment_id)
+        with mock.patch.object(object_model, 'join',
+                               wraps=object_model.join) as join:
+            first = environment.description
+            joins = join.call_count
+            self.assertIs(first, environment.description)
+            self.assertEqual(joins, join.call_count)
+
+            description = self._description('app2')
+            environment.description = description
+            self.assertIs(description, environment.description)
+            self.assertEqual(joins, join.call_count)
+            environment.save(unit)
+
+            unit.refresh(environment)
+            self.assertEqual(description, environment.description)
+            self.assertTrue(join.call_count > joins)
+
+    def test_legacy_description_is_read(self):
+        description = self._description('app1')
+        environment_id = self._save_environment(None)
+        con = session.get_session().connection()
+        con.execute(models.Environment.__table__.update().values(
+            description=description))
+
+        unit = session.get_session()
+        environment = unit.query(models.Environment).get(environment_id)
+        self.assertEqual(description, environment.description)
@@ -0,0 +1,71 @@
+# Copyright (c) 2015 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measures MuranoPL method calls along deep call chains
+
+Each object of a chain calls the same method of the next object, so a
+chain of N objects makes N nested calls. Run with
+
+    python -m murano.tests.unit.dsl.benchmark_call_chain [LENGTH ...]
+"""
+
+import os.path
+import sys
+import timeit
+
+from murano.tests.unit.dsl.foundation import object_model as om
+from murano.tests.unit.dsl.foundation import runner
+from murano.tests.unit.dsl.foundation import test_class_loader
+
+DEFAULT_LENGTHS = (10, 50, 200, 1000)
+REPEAT = 5
+
+
+def _class_loader():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    sys_class_loader = test_class_loader.TestClassLoader(
+        os.path.join(directory, '../../../../meta/io.murano/Classes'),
+        'murano.io')
+    return test_class_loader.TestClassLoader(
+        os.path.join(directory, 'meta'), 'tests', sys_class_loader)
+
+
+def _chain(class_loader, length):
+    # objects are kept in a flat list because loading of deeply nested
+    # models is limited by the Python recursion limit
+    links = [om.Object('CallChain')]
+    for i in xrange(length - 2):
+        links.append(om.Object('CallChain', next=om.Ref(links[-1])))
+    root = om.Object('CallChain', next=om.Ref(links[-1]), links=links)
+    return runner.Runner(root, class_loader)
+
+
+def measure(length, number):
+    """Returns the best time of a single call along a chain in seconds"""
+    chain = _chain(_class_loader(), length)
+    timer = timeit.Timer(chain.testCallChain)
+    return min(timer.repeat(REPEAT, number)) / number
+
+
+def main(argv):
+    lengths = [int(arg) for arg in argv] or DEFAULT_LENGTHS
+    for length in lengths:
+        duration = measure(length, max(1, 1000 // length))
+        print('chain of {0:>5} objects: {1:8.2f} ms per call, '
+              '{2:6.1f} us per nested call'.format(
+                  length, duration * 1000, duration * 1000000 / length))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
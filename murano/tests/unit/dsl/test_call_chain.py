@@ -0,0 +1,77 @@
+# Copyright (c) 2014 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+import mock
+
+from murano.dsl import executor
+from murano.tests.unit.dsl.foundation import object_model as om
+from murano.tests.unit.dsl.foundation import test_case
+
+
+class TestCallChain(test_case.DslTestCase):
+    def _chain(self, length):
+        obj = None
+        for i in xrange(length):
+            obj = om.Object('CallChain', next=obj)
+        return self.new_runner(obj)
+
+    def test_short_chain_runs_in_calling_thread(self):
+        runner = self._chain(executor.MAX_INLINE_CALL_DEPTH - 1)
+        with mock.patch.object(executor.eventlet, 'spawn',
+                               wraps=eventlet.spawn) as spawn:
+            self.assertEqual(executor.MAX_INLINE_CALL_DEPTH - 2,
+                             runner.testCallChain())
+
+        self.assertFalse(spawn.called)
+
+    def test_long_chain(self):
+        runner = self._chain(40)
+        with mock.patch.object(executor.eventlet, 'spawn',
+                               wraps=eventlet.spawn) as spawn:
+            self.assertEqual(39, runner.testCallChain())
+
+        self.assertEqual(39 // executor.MAX_INLINE_CALL_DEPTH,
+                         spawn.call_count)
+
+    def test_deep_reentrant_calls(self):
+        runner = self._chain(1)
+        self.assertEqual(200, runner.testSameObjectCalls(200))
+
+    def test_method_is_locked_for_other_threads(self):
+        runner = self._chain(1)
+        runner.testParallelCalls()
+        self.assertEqual(['first', 'first', 'second', 'second'],
+                         self.traces)
+
+    def test_calls_are_not_traced_without_debug_logging(self):
+        runner = self._chain(3)
+        with mock.patch.object(executor.LOG, 'isEnabledFor',
+                               return_value=False):
+            with mock.patch.object(executor.trace,
+                                   'compose_stack_frame') as compose:
+                runner.testCallChain()
+
+        self.assertFalse(compose.called)
+
+    def test_calls_are_traced_with_debug_logging(self):
+        runner = self._chain(3)
+        with mock.patch.object(executor.LOG, 'isEnabledFor',
+                               return_value=True):
+            with mock.patch.object(executor.trace, 'compose_stack_frame',
+                                   return_value={}) as compose:
+                with mock.patch.object(executor.trace, 'format_frame'):
+                    runner.testCallChain()
+
+        self.assertEqual(2, compose.call_count)
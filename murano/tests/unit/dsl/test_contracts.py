@@ -14,8 +14,13 @@
 
 import types
 
+import mock
+import yaql.context
+
 from murano.dsl import exceptions
 from murano.dsl import murano_object
+from murano.dsl import type_scheme
+from murano.dsl import yaql_expression
 from murano.tests.unit.dsl.foundation import object_model as om
 from murano.tests.unit.dsl.foundation import test_case
 
@@ -33,6 +38,37 @@ class TestContracts(test_case.DslTestCase):
                         'SampleClass2',
                         class2Property='string2'))))
 
+    def test_no_functions_are_registered_per_call(self):
+        self._runner.testStringContract('qwerty')
+        with mock.patch.object(yaql.context.Context,
+                               'register_function') as register_function:
+            self._runner.testStringContract('qwerty')
+            self._runner.testIntContract(123)
+
+        self.assertFalse(register_function.called)
+
+    def test_compiled_contracts_bypass_yaql(self):
+        arg1 = self._runner.root.get_property('sampleClass')
+        arg2 = arg1.get_property('classProperty')
+        with mock.patch.object(type_scheme.ContractContext,
+                               'get_functions') as get_functions:
+            self._runner.testStringContract('qwerty')
+            self._runner.testOwnedContract(arg1, arg2)
+
+        self.assertFalse(get_functions.called)
+
+    def test_contract_compilation(self):
+        def compile_contract(expression):
+            return type_scheme.CompiledContract.compile(
+                yaql_expression.YaqlExpression(expression))
+
+        self.assertIsNotNone(compile_contract('$.string().notNull()'))
+        self.assertIsNotNone(compile_contract('$.class(res:Instance)'))
+        self.assertIsNotNone(compile_contract("$.class(Foo, 'Bar')"))
+        self.assertIsNone(compile_contract('$.string() + 1'))
+        self.assertIsNone(compile_contract('$.class($foo)'))
+        self.assertIsNone(compile_contract('$x.string()'))
+
     def test_string_contract(self):
         result = self._runner.testStringContract('qwerty')
         self.assertIsInstance(result, types.StringTypes)
@@ -16,6 +16,7 @@ import inspect
 import os.path
 import re
 
+import mock
 from testtools import matchers
 
 from murano.dsl import dsl_exception
@@ -71,6 +72,14 @@ class TestExceptions(test_case.DslTestCase):
             ['enter try', 'exit try', 'else section', 'finally section'],
             self.traces)
 
+    def test_handled_exception_has_no_stack_trace(self):
+        with mock.patch.object(dsl_exception, 'compose_frames',
+                               wraps=dsl_exception.compose_frames) as compose:
+            self._runner.testCatchPythonException()
+
+        self.assertEqual(['caught'], self.traces)
+        self.assertFalse(compose.called)
+
     def test_stack_trace(self):
         self._runner.preserve_exception = True
         e = self.assertRaises(
@@ -0,0 +1,53 @@
+# Copyright (c) 2015 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from murano.dsl import object_store
+from murano.tests.unit.dsl.foundation import object_model as om
+from murano.tests.unit.dsl.foundation import test_case
+
+
+class TestGarbageCollection(test_case.DslTestCase):
+    def setUp(self):
+        super(TestGarbageCollection, self).setUp()
+        self._kept = om.Object('GarbageCollection', name='kept')
+        self._nested = om.Object('GarbageCollection', name='nested')
+        self._removed = om.Object('GarbageCollection', name='removed',
+                                  peer=om.Ref(self._kept),
+                                  children=[self._nested])
+        self._root = om.Object('GarbageCollection', name='root',
+                               children=[self._kept, self._removed])
+        self._model = self.new_runner(self._root).serialized_model
+
+    def test_vanished_objects_are_destroyed(self):
+        del self._model['Objects']['children'][1]
+        self.new_runner(self._model)
+
+        self.assertEqual(['nested', 'removed', 'kept'], self.traces)
+
+    def test_nothing_is_built_when_nothing_vanished(self):
+        with mock.patch.object(object_store.ObjectStore,
+                               'load_detached') as load_detached:
+            self.new_runner(self._model)
+
+        self.assertFalse(load_detached.called)
+        self.assertEqual([], self.traces)
+
+    def test_vanished_root_is_destroyed(self):
+        self._model['Objects'] = None
+        self.new_runner(self._model)
+
+        self.assertEqual(['kept', 'nested', 'removed', 'kept', 'root'],
+                         self.traces)
@@ -0,0 +1,45 @@
+# Copyright (c) 2015 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from murano.dsl import murano_object
+from murano.tests.unit.dsl.foundation import object_model as om
+from murano.tests.unit.dsl.foundation import test_case
+
+
+class TestModelLoading(test_case.DslTestCase):
+    def setUp(self):
+        super(TestModelLoading, self).setUp()
+        self._second = om.Object('ModelLoading', name='second')
+        self._first = om.Object('ModelLoading', name='first',
+                                peer=om.Ref(self._second))
+        self._root = om.Object('ModelLoading', name='root',
+                               children=[self._first, self._second])
+
+    def test_forward_references_are_resolved(self):
+        self.new_runner(self._root)
+
+        self.assertEqual(['first', 'second', 'second', 'root'], self.traces)
+
+    def test_properties_are_validated_once(self):
+        spec_class = murano_object.typespec.PropertySpec
+        validate = spec_class.validate
+        with mock.patch.object(spec_class, 'validate',
+                               autospec=True,
+                               side_effect=validate) as validate_mock:
+            self.new_runner(self._root)
+
+        # each of the 3 properties of 3 objects plus the forward reference
+        self.assertEqual(10, validate_mock.call_count)
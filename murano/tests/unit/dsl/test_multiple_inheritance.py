@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+
 from murano.tests.unit.dsl.foundation import object_model as om
 from murano.tests.unit.dsl.foundation import test_case
 
@@ -53,3 +55,42 @@ class TestMultipleInheritance(test_case.DslTestCase):
              'CommonParent::virtualMethod', '-',
              'ParentClass2::virtualMethod'],
             self.traces)
+
+    def test_linearized_mro(self):
+        murano_class = self.class_loader.get_class('DerivedFrom2Classes')
+        self.assertEqual(
+            ['DerivedFrom2Classes', 'ParentClass1', 'ParentClass2',
+             'CommonParent', 'io.murano.Object'],
+            [c.name for c in murano_class.mro])
+
+    def test_method_resolution_is_cached(self):
+        murano_class = self.class_loader.get_class('DerivedFrom2Classes')
+        method = murano_class.find_single_method('testRootMethod')
+        self.assertIs(
+            method, murano_class.find_single_method('testRootMethod'))
+        self.assertEqual('CommonParent', method.murano_class.name)
+
+        parent = self.class_loader.get_class('ParentClass2')
+        override = parent.add_method('testRootMethod', {'Body': []})
+        self.assertIs(
+            override, murano_class.find_single_method('testRootMethod'))
+
+    def test_parts_share_property_store(self):
+        obj = self._runner.executor.object_store.get(self._multi_derived.id)
+        part = obj.cast(self.class_loader.get_class('CommonParent'))
+
+        self.assertEqual('ROOT', part.get_property('rootProperty'))
+        self.assertFalse(hasattr(obj, '__dict__'))
+        self.assertFalse(hasattr(part, '__dict__'))
+        self.assertRaises(TypeError, part.cast, obj.type)
+
+    def test_unrelated_class_keeps_cached_lookups(self):
+        murano_class = self.class_loader.get_class('DerivedFrom2Classes')
+        method = murano_class.find_single_method('testRootMethod')
+
+        other = self.class_loader.get_class('SampleClass3')
+        other.add_method('testRootMethod', {'Body': []})
+        with mock.patch.object(murano_class, '_resolve_single_method') as r:
+            self.assertIs(
+                method, murano_class.find_single_method('testRootMethod'))
+            self.assertFalse(r.called)
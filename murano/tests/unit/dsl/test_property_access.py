@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+
 from murano.dsl import exceptions
 from murano.tests.unit.dsl.foundation import object_model as om
 from murano.tests.unit.dsl.foundation import test_case
@@ -117,3 +119,14 @@ class TestPropertyAccess(test_case.DslTestCase):
             exceptions.NoWriteAccessError,
             self._runner.on(self._multi_derived).
             testModifyUsageTestProperty7)
+
+    def test_property_resolution_is_cached(self):
+        murano_class = self.class_loader.get_class('DerivedFrom2Classes')
+        with mock.patch.object(
+                murano_class, '_resolve_property_reader',
+                wraps=murano_class._resolve_property_reader) as resolve:
+            for i in xrange(2):
+                self.assertEqual(
+                    'ROOT',
+                    self._runner.testPropertyAccessibleOnSeveralPaths())
+        resolve.assert_called_once_with('rootProperty', mock.ANY)
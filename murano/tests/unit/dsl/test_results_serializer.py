@@ -123,3 +123,17 @@ class TestResultsSerializer(test_case.DslTestCase):
         self.assertEqual(
             'John Snow',
             runner2.on(self._class1).testAttributes('John'))
+
+    def test_objects_copy_is_separate_view(self):
+        """Test that ObjectsCopy section shares no containers with Objects
+        and has no designer metadata
+        """
+
+        serialized = self._runner.serialized_model
+        objects = serialized['Objects']
+        objects_copy = serialized['ObjectsCopy']
+        self.assertNotIn('_actions', objects_copy['?'])
+        self.assertIsNot(objects['?'], objects_copy['?'])
+        self.assertIsNot(objects['sampleClass'], objects_copy['sampleClass'])
+        self.assertEqual('string1',
+                         objects_copy['sampleClass']['stringProperty'])
@@ -0,0 +1,88 @@
+# Copyright (c) 2015 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import zipfile
+
+import fixtures
+import mock
+
+from murano.packages import exceptions
+import murano.packages.load_utils as load_utils
+import murano.tests.unit.base as test_base
+
+
+class TestLoadFromZip(test_base.MuranoTestCase):
+    def setUp(self):
+        super(TestLoadFromZip, self).setUp()
+        self.tempdir = self.useFixture(fixtures.TempDir()).path
+
+    def _load(self, name):
+        package_dir = os.path.abspath(
+            os.path.join(__file__, '../test_packages', name)
+        )
+        from_dir = load_utils.load_from_dir(package_dir)
+        archive_path = os.path.join(self.tempdir, name + '.zip')
+        with open(archive_path, 'wb') as archive:
+            archive.write(from_dir.blob)
+        return from_dir, load_utils.load_from_zip(archive_path)
+
+    def test_mpl_package(self):
+        from_dir, from_zip = self._load('test.mpl.v1.app')
+
+        self.assertEqual(from_dir.full_name, from_zip.full_name)
+        self.assertEqual(from_dir.classes, from_zip.classes)
+        for name in from_dir.classes:
+            self.assertEqual(from_dir.get_class(name),
+                             from_zip.get_class(name))
+        self.assertEqual(from_dir.logo, from_zip.logo)
+        self.assertEqual(from_dir.supplier_logo, from_zip.supplier_logo)
+        self.assertEqual(from_dir.blob, from_zip.blob)
+
+    def test_hot_package(self):
+        from_dir, from_zip = self._load('test.hot.v1.app')
+
+        # translated class contains YaqlExpression objects which are
+        # compared by identity, so compare their representations
+        self.assertEqual(repr(from_dir.get_class(from_dir.full_name)),
+                         repr(from_zip.get_class(from_zip.full_name)))
+        self.assertEqual(from_dir.raw_ui, from_zip.raw_ui)
+        self.assertRaises(exceptions.PackageLoadError,
+                          from_zip.get_resource, from_zip.full_name)
+
+    def test_archive_is_closed_with_package(self):
+        from_dir, from_zip = self._load('test.mpl.v1.app')
+        with from_zip:
+            self.assertEqual(from_dir.full_name, from_zip.full_name)
+
+        self.assertIsNone(from_zip._archive.fp)
+
+    def test_archive_is_closed_on_error(self):
+        path = os.path.join(self.tempdir, 'package.zip')
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr('readme', 'There is no manifest')
+
+        with mock.patch('zipfile.ZipFile.close') as close:
+            self.assertRaises(exceptions.PackageLoadError,
+                              load_utils.load_from_zip, path)
+        self.assertTrue(close.called)
+
+    def test_not_a_zip(self):
+        path = os.path.join(self.tempdir, 'package.zip')
+        with open(path, 'w') as f:
+            f.write('This is not a zip archive')
+
+        self.assertRaises(exceptions.PackageFormatError,
+                          load_utils.load_from_zip, path)
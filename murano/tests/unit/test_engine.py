@@ -158,6 +158,8 @@ class TestYaqlExpression(base.MuranoTestCase):
 
     def setUp(self):
         super(TestYaqlExpression, self).setUp()
+        yaql_expression.cache.clear()
+        self.addCleanup(yaql_expression.cache.clear)
 
     def test_expression(self):
         yaql_expr = yaql_expression.YaqlExpression('string')
@@ -189,3 +191,28 @@ class TestYaqlExpression(base.MuranoTestCase):
         with mock.patch('yaql.parse') as parse_mock:
             parse_mock.side_effect = yaql.exceptions.YaqlLexicalException
             self.assertFalse(expr.match(''))
+
+    def test_parse_is_cached(self):
+        with mock.patch('yaql.parse') as parse_mock:
+            first = yaql_expression.YaqlExpression('$.foo')
+            second = yaql_expression.YaqlExpression('$.foo')
+            self.assertTrue(first.match('$.foo'))
+
+        parse_mock.assert_called_once_with('$.foo')
+        self.assertIs(first._parsed_expression, second._parsed_expression)
+        stats = yaql_expression.cache.stats
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(2, stats['hits'])
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = yaql_expression.ExpressionCache(max_size=2)
+        first = cache.get('$a')
+        cache.get('$b')
+        cache.get('$a')
+        cache.get('$c')
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.stats['evictions'])
+        self.assertIs(first, cache.get('$a'))
+        cache.get('$b')
+        self.assertEqual(4, cache.stats['misses'])
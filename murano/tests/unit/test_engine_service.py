@@ -0,0 +1,138 @@
+# Copyright (c) 2015 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+
+import fixtures
+import mock
+
+from murano.common import engine
+from murano.tests.unit import base
+
+
+class TestEngineService(base.MuranoTestCase):
+    def setUp(self):
+        super(TestEngineService, self).setUp()
+        self.override_config('health_report_interval', 0, 'engine')
+        patcher = mock.patch.object(engine, '_prepare_rpc_service')
+        self.prepare_rpc_service = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rpc_server_is_created_on_start(self):
+        service = engine.EngineService()
+        self.assertFalse(self.prepare_rpc_service.called)
+
+        service.start()
+        server = self.prepare_rpc_service.return_value
+        server.start.assert_called_once_with()
+
+        service.stop()
+        server.stop.assert_called_once_with()
+        server.wait.assert_called_once_with()
+
+    @mock.patch.object(engine, 'TaskExecutor')
+    @mock.patch.object(engine, 'rpc')
+    def test_tasks_are_counted(self, rpc, task_executor):
+        service = engine.EngineService()
+        service.start()
+        self.addCleanup(service.stop)
+        task_executor.return_value.execute.side_effect = [None, Exception]
+        endpoint = engine.TaskProcessingEndpoint(service.scheduler)
+        task = {'id': 'id', 'model': {}, 'tenant_id': 'tenant'}
+
+        with mock.patch.object(engine.status_reporter, 'StatusReporter'):
+            endpoint.handle_task({}, task)
+            endpoint.handle_task({}, task)
+            service.scheduler.wait()
+
+        report = engine.WORKER_HEALTH.report()
+        self.assertEqual(2, report['tasks_started'])
+        self.assertEqual(1, report['tasks_failed'])
+        self.assertEqual(0, report['tasks_in_progress'])
+        self.assertEqual(2, service.scheduler.stats['tenant']['completed'])
+
+    @mock.patch.object(engine, 'TaskExecutor')
+    @mock.patch.object(engine, 'rpc')
+    def test_problems_are_sent_with_result(self, rpc, task_executor):
+        task_executor.return_value.execute.side_effect = Exception('failure')
+        task = {'id': 'env', 'model': {}, 'tenant_id': 'tenant'}
+        reports = engine.status_reporter._ReportBuffer()
+        reports._notifier = mock.Mock()
+
+        with mock.patch.object(engine.status_reporter, 'REPORTS', reports):
+            engine.TaskProcessingEndpoint.process_task(task)
+
+        rpc.api.return_value.process_result.assert_called_once_with(
+            {}, 'env', 1, 0)
+
+
+_HOLD_LOCK = """
+import fcntl, sys, time
+lock_file = open(sys.argv[1], 'w')
+fcntl.lockf(lock_file, fcntl.LOCK_EX)
+print('locked')
+sys.stdout.flush()
+time.sleep(0.2)
+open(sys.argv[2], 'w').close()
+fcntl.lockf(lock_file, fcntl.LOCK_UN)
+"""
+
+
+class TestEngineWorkers(base.MuranoTestCase):
+    def setUp(self):
+        super(TestEngineWorkers, self).setUp()
+        self.override_config('health_report_interval', 0, 'engine')
+        self.lock_path = self.useFixture(fixtures.TempDir()).path
+        self.override_config('lock_path', self.lock_path)
+
+    @mock.patch.object(engine, '_prepare_rpc_service', mock.Mock())
+    def test_single_worker_does_not_lock(self):
+        service = engine.EngineService()
+        service.start()
+        self.addCleanup(service.stop)
+
+        self.assertEqual(engine.TaskProcessingEndpoint.process_task,
+                         service.scheduler._handler)
+
+    @mock.patch.object(engine, '_prepare_rpc_service', mock.Mock())
+    def test_several_workers_lock_environments(self):
+        self.override_config('workers', 2, 'engine')
+        service = engine.EngineService()
+        service.start()
+        self.addCleanup(service.stop)
+
+        self.assertEqual(
+            engine.TaskProcessingEndpoint.process_task_exclusively,
+            service.scheduler._handler)
+
+    @mock.patch.object(engine.TaskProcessingEndpoint, 'process_task')
+    def test_environment_busy_in_other_worker(self, process_task):
+        finished = os.path.join(self.lock_path, 'finished')
+        # another worker runs a task of the environment
+        other_worker = subprocess.Popen(
+            [sys.executable, '-c', _HOLD_LOCK,
+             os.path.join(self.lock_path, 'murano-environment-env'),
+             finished], stdout=subprocess.PIPE)
+        self.addCleanup(other_worker.wait)
+        self.assertEqual('locked', other_worker.stdout.readline().strip())
+
+        process_task.side_effect = lambda task: self.assertTrue(
+            os.path.exists(finished))
+        engine.TaskProcessingEndpoint.process_task_exclusively(
+            {'id': 'env'})
+
+        process_task.assert_called_once_with({'id': 'env'})
@@ -0,0 +1,98 @@
+# Copyright (c) 2015 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+
+import fixtures
+import mock
+
+from murano.engine import package_class_loader
+from murano.tests.unit import base
+
+
+class TestClassConfigCache(base.MuranoTestCase):
+    def setUp(self):
+        super(TestClassConfigCache, self).setUp()
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self.cache = package_class_loader.ClassConfigCache()
+
+    def _write(self, name, config, mtime):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            json.dump(config, f)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_config_is_read_once(self):
+        self._write('com.example.App.json', {'key': 'value'}, 1000)
+
+        first = self.cache.get(self.directory, 'com.example.App')
+        second = self.cache.get(self.directory, 'com.example.App')
+
+        self.assertEqual(({'key': 'value'}, True), first)
+        self.assertEqual(({'key': 'value'}, False), second)
+
+    def test_changes_do_not_affect_other_tasks(self):
+        self._write('com.example.App.json', {'key': 'value'}, 1000)
+
+        config, read = self.cache.get(self.directory, 'com.example.App')
+        config['key'] = 'changed'
+
+        self.assertEqual(({'key': 'value'}, False),
+                         self.cache.get(self.directory, 'com.example.App'))
+
+    def test_preload(self):
+        self._write('com.example.App.json', {'key': 'value'}, 1000)
+        self.cache.preload(self.directory)
+
+        self.assertEqual(({'key': 'value'}, False),
+                         self.cache.get(self.directory, 'com.example.App'))
+
+    def test_changed_config_is_read_again(self):
+        self._write('com.example.App.json', {'key': 'value'}, 1000)
+        self.cache.get(self.directory, 'com.example.App')
+        self._write('com.example.App.json', {'key': 'new'}, 2000)
+
+        self.assertEqual(({'key': 'new'}, True),
+                         self.cache.get(self.directory, 'com.example.App'))
+
+    def test_removed_config(self):
+        path = self._write('com.example.App.json', {'key': 'value'}, 1000)
+        self.cache.get(self.directory, 'com.example.App')
+        os.remove(path)
+
+        self.assertEqual(({}, False),
+                         self.cache.get(self.directory, 'com.example.App'))
+
+    def test_reads_are_counted_per_loader(self):
+        self.override_config('class_configs', self.directory, 'engine')
+        self._write('com.example.App.json', {'key': 'value'}, 1000)
+        patcher = mock.patch.object(
+            package_class_loader.PackageClassLoader, 'class_configs',
+            self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        package_loader = mock.Mock()
+        package_loader.get_package_by_class.return_value = None
+
+        for i in xrange(2):
+            loader = package_class_loader.PackageClassLoader(package_loader)
+            for j in xrange(3):
+                loader.get_class_config('com.example.App')
+
+            self.assertEqual({'lookups': 3, 'reads': 1 - i},
+                             loader.config_stats)
@@ -0,0 +1,260 @@
+# Copyright (c) 2015 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import fixtures
+import mock
+from muranoclient.common import exceptions as muranoclient_exc
+
+from murano.dsl import exceptions
+from murano.engine import package_loader
+from murano.packages import load_utils
+from murano.tests.unit import base
+
+
+def _package_blob():
+    directory = os.path.join(os.path.dirname(__file__),
+                             'packages', 'test_packages', 'test.mpl.v1.app')
+    return load_utils.load_from_dir(directory).blob
+
+
+class TestClassDefinitionCache(base.MuranoTestCase):
+    def setUp(self):
+        super(TestClassDefinitionCache, self).setUp()
+        self.cache = package_loader.ClassDefinitionCache()
+        self.package = mock.Mock()
+        self.package.full_name = 'com.example.App'
+        self.package.get_class.side_effect = lambda name: {'Name': name}
+
+    def test_definition_is_parsed_once(self):
+        first = self.cache.get_class(self.package, '1', 'com.example.App')
+        second = self.cache.get_class(self.package, '1', 'com.example.App')
+
+        self.assertIs(first, second)
+        self.package.get_class.assert_called_once_with('com.example.App')
+        self.assertEqual(1, self.cache.stats['hits'])
+        self.assertEqual(1, self.cache.stats['misses'])
+
+    def test_new_version_invalidates_definitions(self):
+        first = self.cache.get_class(self.package, '1', 'com.example.App')
+        second = self.cache.get_class(self.package, '2', 'com.example.App')
+
+        self.assertIsNot(first, second)
+        self.assertEqual(2, self.package.get_class.call_count)
+
+    def test_invalidate(self):
+        self.cache.get_class(self.package, '1', 'com.example.App')
+        self.cache.invalidate('com.example.App')
+        self.cache.get_class(self.package, '1', 'com.example.App')
+
+        self.assertEqual(2, self.package.get_class.call_count)
+
+
+class TestPackageCache(base.MuranoTestCase):
+    def setUp(self):
+        super(TestPackageCache, self).setUp()
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self.download = mock.Mock(return_value=_package_blob())
+
+    def test_package_is_downloaded_once(self):
+        cache = package_loader.PackageCache(self.directory, 0)
+        first = cache.acquire('id', '1', self.download)
+        second = cache.acquire('id', '1', self.download)
+
+        self.assertEqual(first, second)
+        self.assertTrue(os.path.isfile(os.path.join(first, 'manifest.yaml')))
+        self.download.assert_called_once_with()
+        self.assertEqual({'hits': 1, 'misses': 1, 'evictions': 0},
+                         cache.stats)
+
+    def test_new_version_is_downloaded(self):
+        cache = package_loader.PackageCache(self.directory, 0)
+        first = cache.acquire('id', '1', self.download)
+        second = cache.acquire('id', '2', self.download)
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(2, self.download.call_count)
+
+    def test_least_recently_used_package_is_evicted(self):
+        cache = package_loader.PackageCache(self.directory, 1)
+        first = cache.acquire('id', '1', self.download)
+        cache.release(first)
+        second = cache.acquire('id', '2', self.download)
+
+        self.assertFalse(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+        self.assertEqual(1, cache.stats['evictions'])
+
+    def test_used_package_is_not_evicted(self):
+        cache = package_loader.PackageCache(self.directory, 1)
+        first = cache.acquire('id', '1', self.download)
+        cache.acquire('id', '2', self.download)
+
+        self.assertTrue(os.path.exists(first))
+
+    def test_package_used_by_other_process_is_not_evicted(self):
+        other_cache = package_loader.PackageCache(self.directory, 1)
+        first = other_cache.acquire('id', '1', self.download)
+        cache = package_loader.PackageCache(self.directory, 1)
+        cache.acquire('id', '2', self.download)
+
+        self.assertTrue(os.path.exists(first))
+        self.assertEqual(0, cache.stats['evictions'])
+
+        other_cache.release(first)
+        cache.acquire('id', '3', self.download)
+        self.assertFalse(os.path.exists(first))
+
+    def test_lock_files_of_evicted_package_are_removed(self):
+        cache = package_loader.PackageCache(self.directory, 1)
+        first = cache.acquire('id', '1', self.download)
+        cache.release(first)
+        second = cache.acquire('id', '2', self.download)
+
+        key = os.path.basename(second)
+        self.assertEqual(
+            sorted([key, key + '.usage', 'murano-package-' + key]),
+            sorted(os.listdir(self.directory)))
+
+
+class TestApiPackageLoader(base.MuranoTestCase):
+    def setUp(self):
+        super(TestApiPackageLoader, self).setUp()
+        self.override_config('packages_cache',
+                             self.useFixture(fixtures.TempDir()).path,
+                             'packages_opts')
+        cache = package_loader.ClassDefinitionCache()
+        patcher = mock.patch.object(
+            package_loader.ApiPackageLoader, 'class_definitions', cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.loader = package_loader.ApiPackageLoader(mock.Mock())
+        self.addCleanup(self.loader.cleanup)
+
+    def _package(self):
+        package = mock.Mock()
+        package.full_name = 'com.example.App'
+        package.get_class.side_effect = lambda name: {'Name': name}
+        return package
+
+    def test_definitions_are_shared_between_loaders(self):
+        first, second = self._package(), self._package()
+        self.loader._package_versions['com.example.App'] = '2015-01-01'
+        other_loader = package_loader.ApiPackageLoader(mock.Mock())
+        self.addCleanup(other_loader.cleanup)
+        other_loader._package_versions['com.example.App'] = '2015-01-01'
+
+        self.loader.get_class_definition(first, 'com.example.App')
+        other_loader.get_class_definition(second, 'com.example.App')
+
+        self.assertEqual(1, first.get_class.call_count)
+        self.assertEqual(0, second.get_class.call_count)
+
+    def test_packages_are_reused_between_tasks(self):
+        client = mock.Mock()
+        package_def = mock.Mock(id='id', updated='2015-01-01',
+                                fully_qualified_name='test.mpl.v1.app')
+        client.packages.filter.side_effect = lambda **kw: iter([package_def])
+        client.packages.download.return_value = _package_blob()
+
+        for i in xrange(2):
+            with package_loader.ApiPackageLoader(lambda: client) as loader:
+                package = loader.get_package('test.mpl.v1.app')
+                self.assertEqual('test.mpl.v1.app', package.full_name)
+
+        client.packages.download.assert_called_once_with('id')
+
+    def _client(self):
+        client = mock.Mock()
+        client.packages.download.return_value = _package_blob()
+        return client
+
+    def test_packages_are_resolved_with_class_lookup(self):
+        client = self._client()
+        client.json_request.return_value = (None, {'classes': [
+            {'class_name': name, 'package_id': 'id', 'updated': '2015',
+             'fully_qualified_name': 'test.mpl.v1.app'}
+            for name in ('com.example.Foo', 'com.example.Bar')]})
+        loader = package_loader.ApiPackageLoader(lambda: client)
+        self.addCleanup(loader.cleanup)
+
+        packages = loader.get_packages_by_classes(
+            ['com.example.Foo', 'com.example.Bar', 'com.example.Missing'])
+
+        client.json_request.assert_called_once_with(
+            'GET', '/v1/catalog/classes?class_name=com.example.Bar&'
+                   'class_name=com.example.Foo&class_name=com.example.Missing')
+        self.assertFalse(client.packages.filter.called)
+        self.assertEqual(['com.example.Bar', 'com.example.Foo'],
+                         sorted(packages))
+        self.assertIs(packages['com.example.Foo'],
+                      packages['com.example.Bar'])
+        client.packages.download.assert_called_once_with('id')
+
+    def test_packages_are_searched_without_class_lookup(self):
+        client = self._client()
+        client.json_request.side_effect = muranoclient_exc.HTTPNotFound
+        package_def = mock.Mock(id='id', updated='2015-01-01',
+                                fully_qualified_name='test.mpl.v1.app',
+                                class_definitions=['com.example.Foo',
+                                                   'com.example.Bar'])
+        client.packages.filter.return_value = iter([package_def])
+        loader = package_loader.ApiPackageLoader(lambda: client)
+        self.addCleanup(loader.cleanup)
+
+        packages = loader.get_packages_by_classes(
+            ['com.example.Foo', 'com.example.Bar', 'com.example.Missing'])
+
+        client.packages.filter.assert_called_once_with(
+            class_name=['com.example.Bar', 'com.example.Foo',
+                        'com.example.Missing'], limit=3)
+        self.assertEqual(['com.example.Bar', 'com.example.Foo'],
+                         sorted(packages))
+        client.packages.download.assert_called_once_with('id')
+
+    def test_search_reads_only_first_page(self):
+        client = self._client()
+        client.json_request.side_effect = muranoclient_exc.HTTPNotFound
+        package_def = mock.Mock(id='id', updated='2015-01-01',
+                                fully_qualified_name='test.mpl.v1.app',
+                                class_definitions=['com.example.Foo'])
+
+        def pages(**kwargs):
+            yield package_def
+            self.fail('Next page was requested')
+
+        client.packages.filter.side_effect = pages
+        loader = package_loader.ApiPackageLoader(lambda: client)
+        self.addCleanup(loader.cleanup)
+
+        packages = loader.get_packages_by_classes(['com.example.Foo'])
+        self.assertEqual(['com.example.Foo'], list(packages))
+
+    def test_missing_class_raises(self):
+        client = self._client()
+        client.json_request.return_value = (None, {'classes': []})
+        loader = package_loader.ApiPackageLoader(lambda: client)
+
+        self.assertRaises(exceptions.NoPackageForClassFound,
+                          loader.get_package_by_class, 'com.example.Foo')
+
+    def test_unknown_version_is_not_cached(self):
+        package = self._package()
+
+        self.loader.get_class_definition(package, 'com.example.App')
+        self.loader.get_class_definition(package, 'com.example.App')
+
+        self.assertEqual(2, package.get_class.call_count)
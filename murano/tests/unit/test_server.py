@@ -0,0 +1,244 @@
+# Copyright (c) 2015 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+import eventlet
+import mock
+from oslo.utils import timeutils
+
+from murano.common import server
+from murano.db import models
+from murano.db import session
+from murano.services import states
+from murano.tests.unit import base
+
+
+class TestResultEndpoint(base.MuranoWithDBTestCase):
+    def setUp(self):
+        super(TestResultEndpoint, self).setUp()
+        unit = session.get_session()
+        with unit.begin():
+            environment = models.Environment(
+                name='env', tenant_id='tenant', description={})
+            unit.add(environment)
+            unit.flush()
+            self.environment_id = environment.id
+            self.session = models.Session(
+                environment_id=environment.id, user_id='user',
+                state=states.SessionState.DEPLOYING, description={})
+            self.deployment = models.Task(
+                environment_id=environment.id, description={})
+            unit.add(self.session)
+            unit.add(self.deployment)
+
+    def _report(self, level):
+        unit = session.get_session()
+        with unit.begin():
+            unit.add(models.Status(task_id=self.deployment.id,
+                                   text=level, level=level))
+
+    def _result(self):
+        return {
+            'Objects': {
+                '?': {'id': self.environment_id,
+                      'type': 'io.murano.Environment'},
+                'applications': [{'?': {'id': 'app', 'type': 'App'}}]
+            }
+        }
+
+    def _process_result(self, *counts):
+        server.ResultEndpoint.process_result(
+            {}, self._result(), self.environment_id, *counts)
+        unit = session.get_session()
+        return (unit.query(models.Environment).get(self.environment_id),
+                unit.query(models.Task).get(self.deployment.id),
+                unit.query(models.Session).get(self.session.id))
+
+    def test_successful_deployment(self):
+        environment, deployment, conf_session = self._process_result()
+
+        self.assertEqual(1, environment.version)
+        self.assertEqual(['app'], [
+            s['?']['id']
+            for s in environment.description['Objects']['services']])
+        self.assertIsNotNone(deployment.finished)
+        self.assertEqual(['Deployment finished'],
+                         [s.text for s in deployment.statuses])
+        self.assertEqual(states.SessionState.DEPLOYED, conf_session.state)
+
+    def test_deployment_with_errors(self):
+        self._report('error')
+        self._report('warning')
+        environment, deployment, conf_session = self._process_result()
+
+        self.assertIn('Deployment finished with errors',
+                      [s.text for s in deployment.statuses])
+        self.assertEqual(states.SessionState.DEPLOY_FAILURE,
+                         conf_session.state)
+
+    def test_buffered_reports_are_counted(self):
+        reports = server.StatusReportBuffer()
+        reports.add({'id': 'app', 'text': 'failure', 'level': 'error',
+                     'environment_id': self.environment_id})
+
+        with mock.patch.object(server, 'STATUS_REPORTS', reports):
+            environment, deployment, conf_session = self._process_result()
+
+        self.assertEqual(['Deployment finished with errors', 'failure'],
+                         sorted(s.text for s in deployment.statuses))
+
+    def test_problems_buffered_by_other_process(self):
+        other_process_reports = server.StatusReportBuffer()
+        self.addCleanup(other_process_reports.flush)
+        other_process_reports.add({
+            'id': 'app', 'text': 'failure', 'level': 'error',
+            'environment_id': self.environment_id})
+
+        with mock.patch.object(server, 'STATUS_REPORTS',
+                               server.StatusReportBuffer()):
+            environment, deployment, conf_session = \
+                self._process_result(1, 0)
+
+        self.assertEqual(['Deployment finished with errors'],
+                         [s.text for s in deployment.statuses])
+        self.assertEqual(states.SessionState.DEPLOY_FAILURE,
+                         conf_session.state)
+
+    def test_problems_sent_by_engine_are_not_counted_again(self):
+        self._report('error')
+        environment, deployment, conf_session = self._process_result(0, 1)
+
+        self.assertIn('Deployment finished with warnings',
+                      [s.text for s in deployment.statuses])
+        self.assertEqual(states.SessionState.DEPLOYED, conf_session.state)
+
+    def test_count_problems(self):
+        self._report('error')
+        self._report('warning')
+        self._report('warning')
+        self._report('info')
+
+        self.assertEqual((1, 2), server.count_problems(
+            session.get_session(), self.deployment.id))
+
+    def test_last_deployment_with_session(self):
+        deployment, conf_session = server.get_last_deployment_with_session(
+            session.get_session(), self.environment_id,
+            states.SessionState.DEPLOYING)
+
+        self.assertEqual(self.deployment.id, deployment.id)
+        self.assertEqual(self.session.id, conf_session.id)
+
+        deployment, conf_session = server.get_last_deployment_with_session(
+            session.get_session(), self.environment_id,
+            states.SessionState.DELETING)
+        self.assertEqual(self.deployment.id, deployment.id)
+        self.assertIsNone(conf_session)
+
+
+class TestStatusReportBuffer(base.MuranoWithDBTestCase):
+    def setUp(self):
+        super(TestStatusReportBuffer, self).setUp()
+        self.override_config('flush_size', 3, 'status_reports')
+        self.override_config('flush_interval', 10, 'status_reports')
+        unit = session.get_session()
+        with unit.begin():
+            environment = models.Environment(
+                name='env', tenant_id='tenant', description={})
+            unit.add(environment)
+            unit.flush()
+            self.environment_id = environment.id
+            self.deployment = models.Task(
+                environment_id=environment.id, description={})
+            unit.add(self.deployment)
+        self.buffer = server.StatusReportBuffer()
+        self.addCleanup(self.buffer.flush)
+
+    def _report(self, text, level='info'):
+        self.buffer.add({'id': 'app', 'text': text, 'level': level,
+                         'details': None,
+                         'environment_id': self.environment_id})
+
+    def _stored(self):
+        unit = session.get_session()
+        return sorted(status.text for status in unit.query(models.Status)
+                      .filter_by(task_id=self.deployment.id))
+
+    def test_reports_are_stored_in_batches(self):
+        self._report('1')
+        self._report('2')
+        self.assertEqual([], self._stored())
+
+        self._report('3')
+        self.assertEqual(['1', '2', '3'], self._stored())
+
+    def test_reports_are_stored_after_interval(self):
+        self._report('1')
+        eventlet.sleep(0.05)
+
+        self.assertEqual(['1'], self._stored())
+
+    def test_deployments_are_looked_up_once_per_batch(self):
+        with mock.patch.object(server, 'get_last_deployment_ids',
+                               wraps=server.get_last_deployment_ids) as get:
+            self._report('1')
+            self._report('2')
+            self._report('3')
+
+        get.assert_called_once_with(mock.ANY, set([self.environment_id]))
+        self.assertEqual(['1', '2', '3'], self._stored())
+
+    def test_reports_go_to_new_deployment(self):
+        self._report('1')
+        self.buffer.flush()
+        # the result was processed by another API process and the
+        # environment was deployed again
+        unit = session.get_session()
+        with unit.begin():
+            self.deployment = models.Task(
+                environment_id=self.environment_id, description={},
+                started=timeutils.utcnow() + datetime.timedelta(seconds=1))
+            unit.add(self.deployment)
+        self._report('2')
+        self.buffer.flush()
+
+        self.assertEqual(['2'], self._stored())
+
+    def test_reports_are_stored_when_service_stops(self):
+        notification_service = server.NotificationService()
+        with mock.patch.object(server, '_prepare_notification_service'):
+            notification_service.start()
+        with mock.patch.object(server, 'STATUS_REPORTS', self.buffer):
+            self._report('1')
+            notification_service.stop()
+
+        self.assertEqual(['1'], self._stored())
+
+    def test_report_without_deployment_is_dropped(self):
+        self.buffer.add({'id': 'app', 'text': 'text', 'level': 'info',
+                         'environment_id': 'missing'})
+        self.buffer.flush()
+
+        self.assertEqual([], self._stored())
+
+    def test_batched_reports(self):
+        with mock.patch.object(server, 'STATUS_REPORTS', self.buffer):
+            server.report_notifications({'reports': [
+                {'id': 'app', 'text': text, 'level': 'info',
+                 'environment_id': self.environment_id}
+                for text in ('1', '2', '3')]})
+
+        self.assertEqual(['1', '2', '3'], self._stored())
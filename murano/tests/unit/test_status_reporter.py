@@ -0,0 +1,76 @@
+# Copyright (c) 2015 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import mock
+
+from murano.engine.system import status_reporter
+from murano.tests.unit import base
+
+
+class TestStatusReporter(base.MuranoTestCase):
+    def setUp(self):
+        super(TestStatusReporter, self).setUp()
+        self.override_config('report_batch_size', 3, 'engine')
+        self.override_config('report_flush_interval', 10, 'engine')
+        self.buffer = status_reporter._ReportBuffer()
+        self.notifier = self.buffer._notifier = mock.Mock()
+        patcher = mock.patch.object(status_reporter, 'REPORTS', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reporter = status_reporter.StatusReporter()
+        self.reporter.initialize(mock.Mock(object_id='env'))
+
+    def _sent(self):
+        result = []
+        for call in self.notifier.info.call_args_list:
+            context, event_type, payload = call[0]
+            self.assertEqual('murano.report_notifications', event_type)
+            result.append([report['text'] for report in payload['reports']])
+        return result
+
+    def test_reports_are_sent_in_batches(self):
+        instance = mock.Mock(object_id='app')
+        for i in xrange(4):
+            self.reporter.report(instance, str(i))
+
+        self.assertEqual([['0', '1', '2']], self._sent())
+        status_reporter.flush('env')
+        self.assertEqual([['0', '1', '2'], ['3']], self._sent())
+
+    def test_reports_are_sent_after_interval(self):
+        self.reporter.report_error(mock.Mock(object_id='app'), 'error')
+        eventlet.sleep(0.05)
+
+        self.assertEqual([['error']], self._sent())
+        payload = self.notifier.info.call_args[0][2]
+        self.assertEqual([{'id': 'app', 'text': 'error', 'details': None,
+                           'level': 'error', 'environment_id': 'env'}],
+                         payload['reports'])
+
+    def test_flush_without_reports(self):
+        status_reporter.flush('env')
+
+        self.assertFalse(self.notifier.info.called)
+
+    def test_problems_are_counted(self):
+        instance = mock.Mock(object_id='app')
+        self.reporter.report(instance, 'info')
+        self.reporter.report_error(instance, 'error')
+        self.reporter._report(instance, 'warning', level='warning')
+        status_reporter.flush('env')
+
+        self.assertEqual((1, 1), status_reporter.pop_problems('env'))
+        self.assertEqual((0, 0), status_reporter.pop_problems('env'))
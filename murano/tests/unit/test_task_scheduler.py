@@ -0,0 +1,98 @@
+# Copyright (c) 2015 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+
+from murano.engine import task_scheduler
+from murano.tests.unit import base
+
+
+class TestTaskScheduler(base.MuranoTestCase):
+    def setUp(self):
+        super(TestTaskScheduler, self).setUp()
+        self.started = []
+        self.running = set()
+        self.max_running = 0
+
+    def _handler(self, task):
+        self.assertNotIn(task['env'], self.running)
+        self.running.add(task['env'])
+        self.max_running = max(self.max_running, len(self.running))
+        self.started.append(task['name'])
+        eventlet.sleep(0.01)
+        self.running.discard(task['env'])
+
+    def _submit(self, scheduler, tenant, env, name):
+        scheduler.submit(tenant, env, {'env': env, 'name': name})
+
+    def test_concurrency_is_bounded(self):
+        scheduler = task_scheduler.TaskScheduler(self._handler, 2)
+        for i in xrange(5):
+            self._submit(scheduler, 'tenant', 'env%d' % i, i)
+        scheduler.wait()
+
+        self.assertEqual(2, self.max_running)
+        self.assertEqual(range(5), self.started)
+
+    def test_no_concurrency_is_rejected(self):
+        self.assertRaises(ValueError, task_scheduler.TaskScheduler,
+                          self._handler, 0)
+
+    def test_environment_tasks_run_in_order(self):
+        scheduler = task_scheduler.TaskScheduler(self._handler, 10)
+        self._submit(scheduler, 'tenant', 'env', 'deploy')
+        self._submit(scheduler, 'tenant', 'env', 'action')
+        self._submit(scheduler, 'tenant', 'other', 'other')
+        self.assertEqual(1, scheduler.queued)
+        scheduler.wait()
+
+        self.assertEqual(['deploy', 'other', 'action'], self.started)
+
+    def test_tenants_take_turns(self):
+        scheduler = task_scheduler.TaskScheduler(self._handler, 1)
+        for i in xrange(3):
+            self._submit(scheduler, 'busy', 'busy%d' % i, 'busy%d' % i)
+        self._submit(scheduler, 'other', 'other', 'other')
+        scheduler.wait()
+
+        self.assertEqual(['busy0', 'busy1', 'other', 'busy2'], self.started)
+
+    def test_stats(self):
+        scheduler = task_scheduler.TaskScheduler(self._handler, 1)
+        self._submit(scheduler, 'tenant', 'env', 'first')
+        self._submit(scheduler, 'tenant', 'env', 'second')
+
+        stats = scheduler.stats['tenant']
+        self.assertEqual(1, stats['queued'])
+        self.assertEqual(1, stats['running'])
+
+        scheduler.wait()
+        stats = scheduler.stats['tenant']
+        self.assertEqual(0, stats['queued'])
+        self.assertEqual(2, stats['completed'])
+        self.assertTrue(stats['average_run_time'] > 0)
+        self.assertTrue(stats['average_wait_time'] > 0)
+
+    def test_failed_task_frees_environment(self):
+        def handler(task):
+            self.started.append(task['name'])
+            raise Exception()
+
+        scheduler = task_scheduler.TaskScheduler(handler, 1)
+        self._submit(scheduler, 'tenant', 'env', 'first')
+        self._submit(scheduler, 'tenant', 'env', 'second')
+        scheduler.wait()
+
+        self.assertEqual(['first', 'second'], self.started)